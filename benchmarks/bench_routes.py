@@ -0,0 +1,228 @@
+"""Route-level benchmarks against generated databases of several sizes.
+
+Each size preset is loaded into a temporary SQLite database with
+``seed_data.generate_dataset`` and the key routes are driven through the Flask
+test client. For every route the script reports latency percentiles, the SQL
+statements issued per request and the peak Python memory of one traced request.
+
+    python benchmarks/bench_routes.py --sizes small,medium --output bench.json
+    python benchmarks/bench_routes.py --baseline bench.json --threshold 0.25
+
+With ``--baseline`` the run exits with status 1 when any route's latency grows
+by more than the threshold, or its query count grows at all.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import event as sa_event  # noqa: E402
+
+from seed_data import generate_dataset  # noqa: E402
+from website import create_app, db  # noqa: E402
+from website.migrations import upgrade  # noqa: E402
+from website.models import Event, Order  # noqa: E402
+
+# Rows generated per preset: users, events, orders, comments.
+SIZES = {
+    "small": (500, 200, 5_000, 2_000),
+    "medium": (5_000, 2_000, 100_000, 20_000),
+    "large": (50_000, 5_000, 1_000_000, 200_000),
+}
+ROUTES = ("index", "event", "bookings", "book_event", "add_comment")
+PASSWORD = "Password123!"
+
+
+@contextmanager
+def counting_queries(engines):
+    """Count statements sent to any of ``engines`` inside the block."""
+    counter = [0]
+
+    def before_cursor_execute(*_args):
+        counter[0] += 1
+
+    for engine in engines:
+        sa_event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        for engine in engines:
+            sa_event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def percentile(samples: list[float], pct: int) -> float:
+    if len(samples) < 2:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[pct - 1]
+
+
+def _pick_targets(now: datetime) -> tuple[int, int, str]:
+    """Choose the busiest user, the busiest upcoming event and one with seats left."""
+    user_id = db.session.scalar(
+        db.select(Order.user_id).group_by(Order.user_id).order_by(db.func.count().desc()).limit(1)
+    )
+    upcoming = db.select(Event.id).where(Event.start_time > now, Event.status == "Open")
+    hot_event = db.session.scalar(
+        upcoming.order_by((Event.general_sold + Event.vip_sold).desc()).limit(1)
+    )
+    bookable = db.session.scalar(
+        upcoming.order_by((Event.general_capacity - Event.general_sold).desc()).limit(1)
+    )
+    return hot_event, bookable, f"user{user_id}@example.com"
+
+
+def measure(client, engines, request, iterations: int) -> dict:
+    """Time ``request(client)`` and record queries and traced peak memory."""
+    request(client)  # warm-up: template compilation, connection pool, caches
+    timings, queries = [], []
+    for _ in range(iterations):
+        with counting_queries(engines) as counter:
+            started = time.perf_counter()
+            response = request(client)
+            timings.append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{response.request.path} returned {response.status_code}")
+        queries.append(counter[0])
+
+    tracemalloc.start()
+    request(client)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "iterations": iterations,
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "queries": statistics.median_low(queries),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run_size(name: str, iterations: int, seed: int, config: dict) -> dict:
+    users, events, orders, comments = SIZES[name]
+    with tempfile.TemporaryDirectory() as workdir:
+        app = create_app({
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{workdir}/bench.sqlite",
+            "WTF_CSRF_ENABLED": False,
+            "PASSWORD_HASH_PROFILE": "fast",
+            # The timed loops post far faster than any user would.
+            "RATE_LIMIT_ENABLED": False,
+            **config,
+        })
+        with app.app_context():
+            db.create_all()
+            upgrade()
+            started = time.perf_counter()
+            generate_dataset(users, events, orders, comments, seed=seed)
+            print(f"[{name}] generated dataset in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+            hot_event, bookable, email = _pick_targets(datetime.utcnow())
+            engines = list(db.engines.values())
+
+        client = app.test_client()
+        response = client.post("/login", data={
+            "login-email": email, "login-password": PASSWORD, "login-submit": "Log in",
+        })
+        if response.status_code != 302:
+            raise RuntimeError(f"could not log in as {email}")
+
+        requests = {
+            "index": lambda c: c.get("/"),
+            "event": lambda c: c.get(f"/events/{hot_event}"),
+            "bookings": lambda c: c.get("/bookings"),
+            "book_event": lambda c: c.post(
+                f"/events/{bookable}/book", data={"ticket_type": "general", "quantity": 1}
+            ),
+            "add_comment": lambda c: c.post(
+                f"/events/{hot_event}/comments", data={"body": "Benchmark comment"}
+            ),
+        }
+        results = {}
+        for route in ROUTES:
+            with app.app_context():
+                results[route] = measure(client, engines, requests[route], iterations)
+            print(f"[{name}] {route:<12} {results[route]}", file=sys.stderr)
+        with app.app_context():
+            db.engine.dispose()
+        return results
+
+
+def compare(current: dict, baseline: dict, threshold: float, metric: str) -> list[str]:
+    """Return a description of each route that regressed against ``baseline``."""
+    regressions = []
+    for size, routes in current["results"].items():
+        for route, stats in routes.items():
+            before = baseline.get("results", {}).get(size, {}).get(route)
+            if before is None:
+                continue
+            if stats[metric] > before[metric] * (1 + threshold):
+                regressions.append(
+                    f"{size}/{route}: {metric} {before[metric]:.2f} -> {stats[metric]:.2f} ms"
+                )
+            if stats["queries"] > before["queries"]:
+                regressions.append(
+                    f"{size}/{route}: queries {before['queries']} -> {stats['queries']}"
+                )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="small,medium",
+                        help=f"Comma-separated presets from {', '.join(SIZES)} (default: small,medium).")
+    parser.add_argument("--iterations", type=int, default=50, help="Timed requests per route.")
+    parser.add_argument("--seed", type=int, default=0, help="Dataset random seed.")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Disable the listing and fragment caches to measure raw query cost.")
+    parser.add_argument("--output", default="bench_results.json", help="Where to write the JSON results.")
+    parser.add_argument("--baseline", help="Results file to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed fractional latency increase over the baseline (default: 0.2).")
+    parser.add_argument("--metric", choices=("p50_ms", "p95_ms", "p99_ms", "mean_ms"), default="p95_ms",
+                        help="Latency statistic compared against the baseline.")
+    args = parser.parse_args(argv)
+
+    sizes = [size.strip() for size in args.sizes.split(",") if size.strip()]
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        parser.error(f"unknown size(s): {', '.join(unknown)}")
+    config = {"LISTING_CACHE_SIZE": 0, "FRAGMENT_CACHE_SIZE": 0} if args.no_cache else {}
+
+    report = {
+        "meta": {
+            "created": datetime.utcnow().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "iterations": args.iterations,
+            "seed": args.seed,
+            "cache": not args.no_cache,
+        },
+        "results": {size: run_size(size, args.iterations, args.seed, config) for size in sizes},
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+    print(f"Wrote {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(report, baseline, args.threshold, args.metric)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"No regressions against {args.baseline}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
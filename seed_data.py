@@ -1,34 +1,53 @@
-"""Populate the local SQLite database with example events and comments."""
+"""Populate the local SQLite database with example events and comments.
+
+Run without arguments to insert the hand-written demo data. Passing any of
+``--users/--events/--orders/--comments`` generates a synthetic dataset of that
+size instead, for reproducing performance problems at production scale::
+
+    python seed_data.py --users 50000 --events 5000 --orders 2000000 --comments 200000 --seed 7
+"""
 
 from __future__ import annotations
 
+import argparse
+import bisect
+import itertools
+import random
+import time
 from datetime import datetime, timedelta
 from decimal import Decimal
 
-from werkzeug.security import generate_password_hash
-
 from website import create_app, db
-from website.models import Comment, Event, Order, User
+from website.booking import reconcile_ticket_counts
+from website.comments import reconcile_comment_counts
+from website.forms import EVENT_CATEGORY_OPTIONS
+from website.migrations import upgrade
+from website.passwords import hash_password
+from website.models import CatalogueState, Comment, Event, Order, User
 
 
 def seed() -> None:
     # Populate the SQLite database with exemplar users, events, and bookings.
     """Insert sample users, events, and comments if the database is empty."""
-    app = create_app()
+    # Seeded accounts use the fast hashing profile; they are rehashed with the
+    # production profile the first time each one logs in.
+    app = create_app({'PASSWORD_HASH_PROFILE': 'fast'})
     with app.app_context():
         db.create_all()
+        upgrade()
 
         existing_event = db.session.scalar(db.select(Event.id).limit(1))
         if existing_event:
             print("Database already contains events; skipping seeding.")
             return
 
+        password_hash = hash_password("Password123!")
         users: dict[str, User] = {
             "alex": User(
                 first_name="Alex",
                 last_name="Rivera",
                 email="alex@example.com",
-                password_hash=generate_password_hash("Password123!"),
+                password_hash=password_hash,
                 contact_number="0400 111 222",
                 street_address="123 Music Lane, Brisbane",
             ),
@@ -36,7 +55,7 @@ def seed() -> None:
                 first_name="Sam",
                 last_name="Chen",
                 email="sam@example.com",
-                password_hash=generate_password_hash("Password123!"),
+                password_hash=password_hash,
                 contact_number="0400 333 444",
                 street_address="89 Riverfront Ave, Brisbane",
             ),
@@ -44,7 +63,7 @@ def seed() -> None:
                 first_name="Maria",
                 last_name="Lopez",
                 email="maria@example.com",
-                password_hash=generate_password_hash("Password123!"),
+                password_hash=password_hash,
                 contact_number="0400 555 666",
                 street_address="45 Festival Rd, Brisbane",
             ),
@@ -52,7 +71,7 @@ def seed() -> None:
                 first_name="Liam",
                 last_name="O'Connor",
                 email="liam@example.com",
-                password_hash=generate_password_hash("Password123!"),
+                password_hash=password_hash,
                 contact_number="0400 777 111",
                 street_address="12 Valley View, Brisbane",
             ),
@@ -60,7 +79,7 @@ def seed() -> None:
                 first_name="Sienna",
                 last_name="Chambers",
                 email="sienna@example.com",
-                password_hash=generate_password_hash("Password123!"),
+                password_hash=password_hash,
                 contact_number="0400 999 333",
                 street_address="77 Harbour Lane, Brisbane",
             ),
@@ -318,6 +337,8 @@ def seed() -> None:
 
         db.session.add_all(orders)
         db.session.commit()
+        reconcile_ticket_counts()
+        reconcile_comment_counts()
 
         print(
             f"Inserted {len(events)} events, {len(users)} users, {len(comments)} comments, "
@@ -325,5 +346,253 @@ def seed() -> None:
         )
 
 
+# Vocabulary for synthetic rows; combined at random so titles stay searchable.
+_FIRST_NAMES = ["Alex", "Sam", "Maria", "Liam", "Sienna", "Noah", "Ava", "Kai", "Zara", "Ethan",
+                "Mia", "Oscar", "Priya", "Jack", "Chloe", "Mateo", "Harper", "Leo", "Isla", "Ruby"]
+_LAST_NAMES = ["Rivera", "Chen", "Lopez", "O'Connor", "Chambers", "Nguyen", "Smith", "Patel",
+               "Kim", "Brown", "Taylor", "Singh", "Walker", "Martin", "Wilson", "Clarke"]
+_STREETS = ["Music Lane", "Riverfront Ave", "Festival Rd", "Valley View", "Harbour Lane",
+            "Queen St", "Ann St", "Boundary St", "Brunswick St", "Stanley St"]
+_TITLE_WORDS = {
+    "Electronic": ["Pulse", "Neon", "Circuit", "Afterglow", "Synthwave"],
+    "Rock": ["Thunder", "Riff", "Amplified", "Garage", "Overdrive"],
+    "Jazz": ["Blue Note", "Velvet", "Swing", "Late Set", "Improv"],
+    "Classical": ["Symphony", "Sonata", "Strings", "Nocturne", "Overture"],
+    "Latin": ["Salsa", "Fuego", "Tropicana", "Ritmo", "Cumbia"],
+    "Hip Hop": ["Cypher", "Breakbeat", "Block Party", "Mic Check", "Boom Bap"],
+    "Festival": ["Sunset", "Harvest", "Riverside", "Summer", "Open Air"],
+    "Other": ["Variety", "Open Mic", "Showcase", "Cabaret", "Fringe"],
+}
+_TITLE_SUFFIXES = ["Night", "Sessions", "Live", "Festival", "Showcase", "Weekender", "Tour"]
+_VENUES = ["Riverstage", "The Tivoli", "Fortitude Music Hall", "Brisbane Powerhouse",
+           "QPAC Concert Hall", "The Triffid", "South Bank Piazza", "Eatons Hill Hotel"]
+_IMAGES = {
+    "Electronic": "dj.jpg", "Rock": "rock.jpg", "Jazz": "jazz.jpg", "Classical": "symphony.jpg",
+    "Latin": "latin.jpg", "Hip Hop": "hiphop.jpg", "Festival": "concert.jpg", "Other": "indie.jpg",
+}
+_COMMENT_PHRASES = ["Can't wait for this one!", "Is there parking nearby?", "Bought tickets for the crew.",
+                    "Last year's show was incredible.", "What time do doors open?",
+                    "Any VIP tickets left?", "The lineup looks amazing.", "Is this all ages?"]
+# Relative popularity of each category, in EVENT_CATEGORY_OPTIONS order.
+_CATEGORY_WEIGHTS = [18, 16, 10, 8, 10, 14, 16, 8]
+
+
+def _insert_batches(table, rows, batch_size: int) -> int:
+    """Insert ``rows`` with one executemany per batch, committing each batch."""
+    total = 0
+    iterator = iter(rows)
+    while batch := list(itertools.islice(iterator, batch_size)):
+        db.session.execute(table.insert(), batch)
+        db.session.commit()
+        total += len(batch)
+    return total
+
+
+def _next_id(model) -> int:
+    return (db.session.scalar(db.select(db.func.max(model.id))) or 0) + 1
+
+
+def generate_dataset(users: int, events: int, orders: int, comments: int, *,
+                     seed: int = 0, batch_size: int = 10_000, now: datetime | None = None) -> dict:
+    """Append a deterministic synthetic dataset to the current app's database.
+
+    Event popularity follows a Zipf-like curve so a few events attract most
+    orders and comments; about a third of events are in the past. Orders never
+    exceed an event's capacity, and the denormalised counters are written once
+    at the end. Returns the number of rows inserted per table.
+    """
+    rng = random.Random(seed)
+    now = (now or datetime.utcnow()).replace(minute=0, second=0, microsecond=0)
+    if users < 1 and (events or orders or comments):
+        raise ValueError("Synthetic events, orders and comments need at least one user.")
+    password_hash = hash_password("Password123!")
+
+    first_user = _next_id(User)
+    user_ids = range(first_user, first_user + users)
+
+    def user_rows():
+        for user_id in user_ids:
+            yield {
+                "id": user_id,
+                "first_name": rng.choice(_FIRST_NAMES),
+                "last_name": rng.choice(_LAST_NAMES),
+                "email": f"user{user_id}@example.com",
+                "password_hash": password_hash,
+                "contact_number": f"04{rng.randrange(10**8):08d}",
+                "street_address": f"{rng.randint(1, 400)} {rng.choice(_STREETS)}, Brisbane",
+            }
+
+    first_event = _next_id(Event)
+    event_ids = list(range(first_event, first_event + events))
+    # Size venues so that, overall, roughly two thirds of the seats sell.
+    typical_capacity = max(200, orders * 3 // max(events, 1))
+    capacity: dict[int, list[int]] = {}
+    starts: dict[int, datetime] = {}
+
+    def event_rows():
+        for event_id in event_ids:
+            category = rng.choices(EVENT_CATEGORY_OPTIONS, weights=_CATEGORY_WEIGHTS)[0]
+            if rng.random() < 0.35:
+                start = now - timedelta(days=rng.randint(1, 365), hours=rng.randint(0, 12))
+            else:
+                start = now + timedelta(days=rng.randint(0, 180), hours=rng.randint(1, 12))
+            starts[event_id] = start
+            general_capacity = int(rng.lognormvariate(0, 0.8) * typical_capacity) + 20
+            vip_capacity = rng.choice([0, 0, 20, 50, 100])
+            capacity[event_id] = [general_capacity, vip_capacity]
+            general_price = Decimal(rng.randrange(25, 180)) + Decimal("0.00")
+            yield {
+                "id": event_id,
+                "title": f"{rng.choice(_TITLE_WORDS[category])} {rng.choice(_TITLE_SUFFIXES)} #{event_id}",
+                "venue": rng.choice(_VENUES),
+                "description": f"A {category.lower()} event at {rng.choice(_VENUES)}.",
+                "start_time": start,
+                "end_time": start + timedelta(hours=rng.randint(2, 6)),
+                "general_price": general_price,
+                "vip_price": general_price * 2 if vip_capacity else None,
+                "status": "Cancelled" if rng.random() < 0.03 else "Open",
+                "category": category,
+                "image_url": f"img/{_IMAGES[category]}",
+                "general_capacity": general_capacity,
+                "vip_capacity": vip_capacity,
+                "owner_id": rng.choice(user_ids),
+                "updated_at": now,
+            }
+
+    def popularity(ids):
+        # Cumulative Zipf weights over a shuffled ranking of ``ids``.
+        ranked = list(ids)
+        rng.shuffle(ranked)
+        cumulative = list(itertools.accumulate(1 / (rank ** 1.1) for rank in range(1, len(ranked) + 1)))
+        return ranked, cumulative
+
+    sold = {event_id: [0, 0] for event_id in event_ids}
+
+    def order_rows():
+        ranked, cumulative = popularity(event_ids)
+        misses = 0
+        for order_id in itertools.count(_next_id(Order)):
+            # Drop sold-out events from the draw once they start wasting picks.
+            if misses >= 100 or not ranked:
+                kept = [i for i, event_id in enumerate(ranked) if sold[event_id] != capacity[event_id]]
+                if not kept:
+                    return
+                weights = [cumulative[i] - (cumulative[i - 1] if i else 0) for i in kept]
+                ranked = [ranked[i] for i in kept]
+                cumulative = list(itertools.accumulate(weights))
+                misses = 0
+            event_id = ranked[bisect.bisect_left(cumulative, rng.random() * cumulative[-1])]
+            slot = 1 if capacity[event_id][1] and rng.random() < 0.15 else 0
+            if sold[event_id][slot] >= capacity[event_id][slot]:
+                slot = 1 - slot
+            remaining = capacity[event_id][slot] - sold[event_id][slot]
+            if remaining <= 0:
+                misses += 1
+                continue
+            quantity = min(rng.choices((1, 2, 3, 4, 6), weights=(30, 40, 15, 10, 5))[0], remaining)
+            sold[event_id][slot] += quantity
+            start = starts[event_id]
+            opened = start - timedelta(days=90)
+            latest = min(start, now)
+            created = opened + (latest - opened) * rng.random() if latest > opened else latest
+            yield {
+                "id": order_id,
+                "quantity": quantity,
+                "created_at": created,
+                "ticket_type": "vip" if slot else "general",
+                "user_id": rng.choice(user_ids),
+                "event_id": event_id,
+            }
+
+    comment_counts = dict.fromkeys(event_ids, 0)
+
+    def comment_rows():
+        ranked, cumulative = popularity(event_ids)
+        if not ranked:
+            return
+        total = cumulative[-1]
+        for comment_id in itertools.count(_next_id(Comment)):
+            event_id = ranked[bisect.bisect_left(cumulative, rng.random() * total)]
+            comment_counts[event_id] += 1
+            start = starts[event_id]
+            yield {
+                "id": comment_id,
+                "body": rng.choice(_COMMENT_PHRASES),
+                "created_at": min(start - timedelta(minutes=rng.randint(0, 60 * 24 * 60)), now),
+                "user_id": rng.choice(user_ids),
+                "event_id": event_id,
+            }
+
+    counts = {"users": _insert_batches(User.__table__, user_rows(), batch_size)}
+    counts["events"] = _insert_batches(Event.__table__, event_rows(), batch_size)
+    counts["orders"] = _insert_batches(Order.__table__, itertools.islice(order_rows(), orders), batch_size)
+    counts["comments"] = _insert_batches(
+        Comment.__table__, itertools.islice(comment_rows(), comments), batch_size
+    )
+
+    updates = [
+        {
+            "b_id": event_id,
+            "general_sold": sold[event_id][0],
+            "vip_sold": sold[event_id][1],
+            "comment_count": comment_counts[event_id],
+            "sold_out": sold[event_id] == capacity[event_id],
+        }
+        for event_id in event_ids
+        if any(sold[event_id]) or comment_counts[event_id]
+    ]
+    table = Event.__table__
+    statement = (
+        table.update()
+        .where(table.c.id == db.bindparam("b_id"))
+        .values(
+            general_sold=db.bindparam("general_sold"),
+            vip_sold=db.bindparam("vip_sold"),
+            comment_count=db.bindparam("comment_count"),
+            status=db.case(
+                (db.and_(db.bindparam("sold_out"), table.c.status == "Open"), "Sold Out"),
+                else_=table.c.status,
+            ),
+        )
+    )
+    for start in range(0, len(updates), batch_size):
+        db.session.execute(statement, updates[start:start + batch_size])
+    CatalogueState.bump()
+    db.session.commit()
+    return counts
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, help="Synthetic users to generate.")
+    parser.add_argument("--events", type=int, help="Synthetic events to generate.")
+    parser.add_argument("--orders", type=int, help="Synthetic orders to generate.")
+    parser.add_argument("--comments", type=int, help="Synthetic comments to generate.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0).")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="Rows per insert transaction.")
+    parser.add_argument("--database", help="SQLAlchemy URI to load instead of the configured database.")
+    args = parser.parse_args(argv)
+
+    sizes = (args.users, args.events, args.orders, args.comments)
+    if all(size is None for size in sizes):
+        seed()
+        return
+
+    config = {"PASSWORD_HASH_PROFILE": "fast"}
+    if args.database:
+        config["SQLALCHEMY_DATABASE_URI"] = args.database
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+        upgrade()
+        started = time.perf_counter()
+        counts = generate_dataset(
+            *(size or 0 for size in sizes), seed=args.seed, batch_size=args.batch_size
+        )
+    elapsed = time.perf_counter() - started
+    summary = ", ".join(f"{count} {name}" for name, count in counts.items())
+    print(f"Inserted {summary} in {elapsed:.1f}s.")
+
+
 if __name__ == "__main__":
-    seed()
+    main()
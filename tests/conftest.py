@@ -0,0 +1,104 @@
+"""Shared fixtures: an application on a throwaway SQLite database, users and events."""
+
+from __future__ import annotations
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from website import create_app, db  # noqa: E402
+from website.migrations import upgrade  # noqa: E402
+from website.models import Event, User  # noqa: E402
+from website.passwords import hash_password  # noqa: E402
+
+PASSWORD = "Password123!"
+
+
+@pytest.fixture
+def app_config():
+    """Extra settings for the ``app`` fixture; override in a module to change them."""
+    return {}
+
+
+@pytest.fixture
+def app(tmp_path, app_config):
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path}/test.sqlite",
+        "TESTING": True,
+        "WTF_CSRF_ENABLED": False,
+        "PASSWORD_HASH_PROFILE": "fast",
+        "IMAGE_DERIVATIVE_DIR": str(tmp_path / "derived-images"),
+        **app_config,
+    })
+    with app.app_context():
+        db.create_all()
+        upgrade()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def user_factory(app):
+    """Create a user ``<name>@example.com`` with :data:`PASSWORD`; returns its id."""
+
+    def make(name: str, **fields) -> int:
+        with app.app_context():
+            user = User(**{
+                "first_name": name.title(), "last_name": "Tester", "email": f"{name}@example.com",
+                "password_hash": hash_password(PASSWORD), "contact_number": "0400 000 000",
+                "street_address": "1 Test St", **fields,
+            })
+            db.session.add(user)
+            db.session.commit()
+            return user.id
+
+    return make
+
+
+@pytest.fixture
+def owner(user_factory):
+    """Id of ``owner@example.com``, who owns the events made by ``event_factory``."""
+    return user_factory("owner")
+
+
+@pytest.fixture
+def event_factory(app, owner):
+    """Create an event starting ``days`` from now and lasting three hours; returns its id."""
+
+    def make(title: str = "Test Event", *, days: float = 7, **fields) -> int:
+        with app.app_context():
+            start = datetime.utcnow() + timedelta(days=days)
+            event = Event(**{
+                "title": title, "venue": "Hall", "description": "Test event.",
+                "start_time": start, "end_time": start + timedelta(hours=3),
+                "general_price": 20, "general_capacity": 50, "owner_id": owner, **fields,
+            })
+            db.session.add(event)
+            db.session.commit()
+            return event.id
+
+    return make
+
+
+@pytest.fixture
+def login(client):
+    """Sign ``client`` in as ``<name>@example.com``."""
+
+    def log_in(name: str = "owner") -> None:
+        response = client.post("/login", data={
+            "login-email": f"{name}@example.com", "login-password": PASSWORD, "login-submit": "Log in",
+        })
+        assert response.status_code == 302
+
+    return log_in
@@ -0,0 +1,23 @@
+"""The benchmark harness must run against the application's default config."""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+
+from conftest import ROOT
+
+_spec = importlib.util.spec_from_file_location("bench_routes", ROOT / "benchmarks" / "bench_routes.py")
+bench_routes = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(bench_routes)
+
+
+def test_small_run_completes_with_default_config(tmp_path):
+    output = tmp_path / "bench.json"
+
+    status = bench_routes.main(["--sizes", "small", "--iterations", "20", "--output", str(output)])
+
+    assert status == 0
+    results = json.loads(output.read_text())["results"]["small"]
+    assert set(results) == set(bench_routes.ROUTES)
+    assert all(stats["iterations"] == 20 for stats in results.values())
@@ -0,0 +1,70 @@
+"""Oversell guard and rejection outcomes of the booking engine."""
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from website import db
+from website.booking import BOOKED, SOLD_OUT, UNAVAILABLE, reserve_tickets
+from website.models import Event, Order
+
+
+def _reserve(app, event_id: int, user_id: int, quantity: int = 1):
+    with app.app_context():
+        return reserve_tickets(event_id, user_id, "general", quantity)
+
+
+def test_concurrent_requests_for_the_last_seat_never_oversell(app, owner, event_factory):
+    event_id = event_factory(general_capacity=1)
+    start = threading.Barrier(2)
+    results = []
+
+    def book():
+        start.wait()
+        results.append(_reserve(app, event_id, owner).status)
+
+    threads = [threading.Thread(target=book) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(results) == sorted([BOOKED, SOLD_OUT])
+    with app.app_context():
+        event = db.session.get(Event, event_id)
+        assert event.general_sold == 1
+        assert event.status == "Sold Out"
+        assert db.session.scalar(db.select(db.func.count(Order.id)).where(Order.event_id == event_id)) == 1
+
+
+def test_requests_beyond_capacity_are_sold_out(app, owner, event_factory):
+    event_id = event_factory(general_capacity=3)
+
+    outcomes = [_reserve(app, event_id, owner, quantity=2) for _ in range(2)]
+
+    assert [outcome.status for outcome in outcomes] == [BOOKED, SOLD_OUT]
+    assert outcomes[1].remaining == 1
+    with app.app_context():
+        assert db.session.get(Event, event_id).general_sold == 2
+
+
+@pytest.mark.parametrize("fields", [{"status": "Cancelled"}, {"days": -2}])
+def test_cancelled_or_expired_events_are_unavailable(app, owner, event_factory, fields):
+    event_id = event_factory(**fields)
+
+    result = _reserve(app, event_id, owner)
+
+    assert result.status == UNAVAILABLE
+    with app.app_context():
+        assert db.session.get(Event, event_id).general_sold == 0
+
+
+def test_owner_sold_out_status_is_sold_out(app, owner, event_factory):
+    event_id = event_factory(status="Sold Out", general_capacity=10)
+
+    result = _reserve(app, event_id, owner)
+
+    assert result.status == SOLD_OUT
+    assert result.remaining == 10
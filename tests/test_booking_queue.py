@@ -0,0 +1,29 @@
+"""Bookings applied by the single-writer queue."""
+
+from __future__ import annotations
+
+import pytest
+
+from website.booking import BOOKED
+from website.booking_queue import BookingQueue
+
+
+@pytest.fixture
+def event_id(event_factory):
+    return event_factory("Queued", general_capacity=10)
+
+
+def test_uncollected_results_expire(app, owner, event_id):
+    booking_queue = BookingQueue(app, batch_size=10, max_depth=10, linger=0, result_ttl=60)
+    pending = booking_queue.submit(event_id, owner, "general", 1, "Queued")
+    assert pending.future.result(timeout=5).status == BOOKED
+
+    # Still collectable on /bookings within the TTL...
+    booking_queue.take_pending(owner + 1)
+    assert booking_queue._pending == {owner: [pending]}
+
+    # ...and swept once it has been resolved for longer, without the owner returning.
+    pending.resolved_at -= 61
+    booking_queue._next_sweep = 0
+    booking_queue.take_pending(owner + 1)
+    assert booking_queue._pending == {}
@@ -0,0 +1,19 @@
+"""Conditional GETs on the listing and event pages."""
+
+from __future__ import annotations
+
+import pytest
+
+
+@pytest.mark.parametrize("url", ["/", "/events/{event_id}"])
+def test_pending_flashes_are_never_answered_with_304(client, event_factory, url):
+    url = url.format(event_id=event_factory("Flash Gig"))
+    etag = client.get(url).headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    with client.session_transaction() as session:
+        session["_flashes"] = [("info", "Your event was deleted.")]
+
+    response = client.get(url, headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
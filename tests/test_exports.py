@@ -0,0 +1,73 @@
+"""Attendee exports at ``/events/<id>/attendees.<format>``."""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+
+import pytest
+
+from website import db
+from website.exports import COLUMNS
+from website.models import Order
+
+
+@pytest.fixture
+def event_id(app, owner, user_factory, event_factory):
+    guest = user_factory("guest", contact_number='=HYPERLINK("x")')
+    user_factory("other")
+    event_id = event_factory("Export Night")
+    with app.app_context():
+        db.session.add_all([
+            Order(event_id=event_id, user_id=guest, ticket_type="general", quantity=2),
+            Order(event_id=event_id, user_id=owner, ticket_type="general", quantity=1),
+        ])
+        db.session.commit()
+    return event_id
+
+
+def test_csv_export_lists_every_order(client, login, event_id):
+    login("owner")
+
+    response = client.get(f"/events/{event_id}/attendees.csv")
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+    assert f'filename="event-{event_id}-attendees.csv"' in response.headers["Content-Disposition"]
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert rows[0] == list(COLUMNS)
+    assert [(row[2], row[3], row[6]) for row in rows[1:]] == [
+        ("general", "2", "guest@example.com"),
+        ("general", "1", "owner@example.com"),
+    ]
+    # Formula-like cells are neutralised for spreadsheet software.
+    assert rows[1][7] == "'=HYPERLINK(\"x\")"
+
+
+def test_ndjson_export_writes_one_object_per_order(app, client, login, event_id):
+    app.config["EXPORT_BATCH_SIZE"] = 1
+    login("owner")
+
+    response = client.get(f"/events/{event_id}/attendees.ndjson")
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [(record["email"], record["quantity"]) for record in records] == [
+        ("guest@example.com", 2),
+        ("owner@example.com", 1),
+    ]
+    assert set(records[0]) == set(COLUMNS)
+
+
+def test_export_is_forbidden_to_other_users(client, login, event_id):
+    login("other")
+
+    assert client.get(f"/events/{event_id}/attendees.csv").status_code == 403
+
+
+def test_unknown_format_is_not_found(client, login, event_id):
+    login("owner")
+
+    assert client.get(f"/events/{event_id}/attendees.xml").status_code == 404
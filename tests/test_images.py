@@ -0,0 +1,62 @@
+"""Markup produced by the ``responsive_image`` template helper."""
+
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+
+from website.images import ImageManifest, queue_derivatives, responsive_image
+
+
+@pytest.fixture
+def manifest(app, tmp_path):
+    path = tmp_path / "manifest.json"
+    path.write_text(json.dumps({
+        "img/hero1.jpg": {
+            "hash": "abc123",
+            "width": 1200,
+            "height": 600,
+            "bytes": 1,
+            "files": {
+                fmt: {str(width): f"hero1-abc123-{width}w.{ext}" for width in (400, 800)}
+                for fmt, ext in (("webp", "webp"), ("jpeg", "jpg"))
+            },
+        },
+    }))
+    app.extensions["image_manifest"] = ImageManifest(str(path))
+    return path
+
+
+def test_known_image_renders_picture_with_srcsets(app, manifest):
+    with app.test_request_context():
+        html = str(responsive_image("img/hero1.jpg", "card", alt="Hero"))
+
+    assert html.startswith("<picture><source type=\"image/webp\"")
+    assert "/media/images/hero1-abc123-400w.jpg 400w" in html
+    assert 'width="800" height="400"' in html
+
+
+def test_widths_changed_without_rebuild_fall_back_to_original(app, manifest):
+    app.config["IMAGE_DERIVATIVE_WIDTHS"] = {**app.config["IMAGE_DERIVATIVE_WIDTHS"], "card": (480, 960)}
+
+    with app.test_request_context():
+        html = str(responsive_image("img/hero1.jpg", "card", alt="Hero"))
+
+    assert html == '<img src="/static/img/hero1.jpg" alt="Hero">'
+
+
+def test_saved_images_are_built_in_the_background_outside_the_package(app, client):
+    with app.test_request_context():
+        entry = queue_derivatives("img/dj.jpg").result(timeout=30)
+
+    directory = app.config["IMAGE_DERIVATIVE_DIR"]
+    name = entry["files"]["webp"]["400"]
+    assert os.path.isfile(os.path.join(directory, name))
+    assert not os.path.exists(os.path.join(app.static_folder, "img", "derived"))
+
+    response = client.get(f"/media/images/{name}")
+    assert response.status_code == 200
+    assert response.cache_control.immutable
+    assert client.get("/media/images/manifest.json").status_code == 404
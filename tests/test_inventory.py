@@ -0,0 +1,63 @@
+"""Seat availability in the in-memory allocator."""
+
+from __future__ import annotations
+
+import pytest
+
+from website import db
+from website.inventory import InventoryAllocator
+from website.models import Event
+
+
+@pytest.fixture
+def event_id(event_factory):
+    return event_factory("Last Seats", general_capacity=2)
+
+
+def test_refresh_reads_counters_from_the_database(app, event_id):
+    allocator = InventoryAllocator(hold_seconds=60, refresh_seconds=60, sweep_interval=60)
+    with app.app_context():
+        event = db.session.get(Event, event_id)
+        assert allocator.hold(event_id, 1, "general", 1) is not None
+        # Another worker sells the remaining seats behind this session's back.
+        with db.engine.begin() as connection:
+            connection.execute(db.update(Event).where(Event.id == event_id).values(general_sold=2))
+
+        allocator.invalidate(event_id)
+        claim = allocator.claim(None, event_id, 2, "general", 1)
+
+        assert claim is None
+        assert event.general_sold == 2
+
+
+def test_expiry_releases_only_holds_that_were_not_renewed(app, event_id, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("website.inventory.time.monotonic", lambda: clock[0])
+    allocator = InventoryAllocator(hold_seconds=60, refresh_seconds=600, sweep_interval=60)
+    with app.app_context():
+        renewed = allocator.hold(event_id, 1, "general", 1)
+        lapsed = allocator.hold(event_id, 2, "general", 1)
+        clock[0] += 45
+        # Rendering the form again renews the first user's hold under the same token.
+        assert allocator.hold(event_id, 1, "general", 1) is renewed
+        clock[0] += 45
+
+        claim = allocator.claim(None, event_id, 3, "general", 1)
+
+        assert claim is not None
+        assert allocator.claim(renewed.token, event_id, 1, "general", 1) is not None
+        assert lapsed.token not in allocator._holds
+
+
+@pytest.mark.parametrize("app_config", [{"INVENTORY_HOLDS_ENABLED": True}])
+def test_cancelled_event_is_not_reported_as_taken(client, login, event_factory):
+    event_id = event_factory("Called Off", status="Cancelled")
+    login()
+
+    response = client.post(f"/events/{event_id}/book", data={
+        "ticket_type": "general", "quantity": 1, "submit": "Book Now",
+    }, follow_redirects=True)
+
+    body = response.get_data(as_text=True)
+    assert "Bookings are unavailable for this event" in body
+    assert "just been taken" not in body
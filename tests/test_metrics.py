@@ -0,0 +1,36 @@
+"""Prometheus metrics aggregated across worker snapshots."""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def app_config(tmp_path):
+    return {"METRICS_DIR": str(tmp_path / "metrics")}
+
+
+def _exited_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_snapshots_of_exited_workers_are_pruned(app, client, tmp_path):
+    directory = tmp_path / "metrics"
+    directory.mkdir()
+    stale = directory / f"metrics-{_exited_pid()}.json"
+    stale.write_text(json.dumps({
+        "counters": [["booking_attempts_total", {"outcome": "booked"}, 7]], "histograms": [],
+    }))
+
+    body = client.get("/metrics").get_data(as_text=True)
+
+    assert 'booking_attempts_total{outcome="booked"}' not in body
+    assert not stale.exists()
+    assert (directory / f"metrics-{os.getpid()}.json").exists()
@@ -0,0 +1,79 @@
+"""Upgrading a database created with the original schema."""
+
+from __future__ import annotations
+
+import pytest
+
+from website import create_app, db
+from website.migrations import available_migrations, column_names, upgrade
+
+# The tables as the first release created them, before any migration existed.
+ORIGINAL_SCHEMA = (
+    """CREATE TABLE user (
+        id INTEGER NOT NULL, first_name VARCHAR(80) NOT NULL, last_name VARCHAR(80) NOT NULL,
+        email VARCHAR(120) NOT NULL, password_hash VARCHAR(255) NOT NULL,
+        contact_number VARCHAR(30) NOT NULL, street_address VARCHAR(255) NOT NULL,
+        PRIMARY KEY (id), UNIQUE (email))""",
+    """CREATE TABLE event (
+        id INTEGER NOT NULL, title VARCHAR(150) NOT NULL, venue VARCHAR(150) NOT NULL,
+        description TEXT NOT NULL, start_time DATETIME NOT NULL, end_time DATETIME NOT NULL,
+        general_price NUMERIC(10, 2) NOT NULL, vip_price NUMERIC(10, 2), status VARCHAR(40) NOT NULL,
+        category VARCHAR(60), image_url VARCHAR(255), general_capacity INTEGER NOT NULL,
+        vip_capacity INTEGER NOT NULL, owner_id INTEGER NOT NULL,
+        PRIMARY KEY (id), FOREIGN KEY(owner_id) REFERENCES user (id))""",
+    """CREATE TABLE comment (
+        id INTEGER NOT NULL, body TEXT NOT NULL, created_at DATETIME NOT NULL,
+        user_id INTEGER NOT NULL, event_id INTEGER NOT NULL, PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES user (id), FOREIGN KEY(event_id) REFERENCES event (id))""",
+    """CREATE TABLE "order" (
+        id INTEGER NOT NULL, quantity INTEGER NOT NULL, created_at DATETIME NOT NULL,
+        ticket_type VARCHAR(20) NOT NULL, user_id INTEGER NOT NULL, event_id INTEGER NOT NULL,
+        PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES user (id),
+        FOREIGN KEY(event_id) REFERENCES event (id))""",
+    "INSERT INTO user VALUES (1, 'Alex', 'Rivera', 'alex@example.com', 'x', '0400', '1 St')",
+    """INSERT INTO event VALUES (1, 'Jazz Night', 'Hall', 'Jazz.', '2030-01-01 19:00:00',
+        '2030-01-01 22:00:00', 20, 40, 'Open', 'Jazz', NULL, 50, 10, 1)""",
+    "INSERT INTO \"order\" VALUES (1, 2, '2029-12-01 10:00:00', 'general', 1, 1)",
+    "INSERT INTO \"order\" VALUES (2, 1, '2029-12-01 11:00:00', 'vip', 1, 1)",
+    "INSERT INTO comment VALUES (1, 'Great!', '2029-12-02 10:00:00', 1, 1)",
+)
+
+
+def _schema(connection) -> dict[str, set[str]]:
+    tables = connection.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+    ).scalars().all()
+    indexes = connection.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'ix_%'"
+    ).scalars().all()
+    return {"indexes": set(indexes), **{table: column_names(connection, table) for table in tables}}
+
+
+@pytest.fixture
+def original_app(tmp_path):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path}/original.sqlite", "TESTING": True})
+    with app.app_context():
+        with db.engine.begin() as connection:
+            for statement in ORIGINAL_SCHEMA:
+                connection.exec_driver_sql(statement)
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+def test_upgrade_brings_the_original_schema_up_to_date(app, original_app):
+    with original_app.app_context():
+        applied = upgrade()
+        with db.engine.connect() as connection:
+            upgraded = _schema(connection)
+            event = connection.exec_driver_sql(
+                "SELECT general_sold, vip_sold, version, comment_count FROM event WHERE id = 1"
+            ).one()
+            matches = connection.exec_driver_sql("SELECT rowid FROM event_fts WHERE event_fts MATCH 'jazz'").all()
+    with app.app_context(), db.engine.connect() as connection:
+        created = _schema(connection)
+
+    assert [version for version, _ in applied] == [version for version, _, _ in available_migrations()]
+    assert upgraded == created
+    assert tuple(event) == (2, 1, 1, 1)
+    assert matches == [(1,)]
@@ -0,0 +1,94 @@
+"""Keyset cursors and the paginated home page listing."""
+
+from __future__ import annotations
+
+import base64
+import html
+import json
+import re
+from datetime import datetime
+
+import pytest
+
+from website.models import Event
+from website.pagination import decode_cursor, encode_cursor
+
+KEYS = (Event.start_time, Event.id)
+
+
+@pytest.fixture
+def app_config():
+    return {"EVENTS_PER_PAGE": 2, "LISTING_CACHE_SIZE": 0}
+
+
+@pytest.fixture
+def titles(event_factory):
+    """Upcoming events in listing order: three open ones, then three sold out."""
+    specs = [
+        ("Open 1", "Open", 1), ("Sold 1", "Sold Out", 2), ("Open 2", "Open", 3),
+        ("Sold 2", "Sold Out", 4), ("Open 3", "Open", 5), ("Sold 3", "Sold Out", 6),
+    ]
+    for title, status, days in specs:
+        event_factory(title, days=days, status=status)
+    return ["Open 1", "Open 2", "Open 3", "Sold 1", "Sold 2", "Sold 3"]
+
+
+def _cards(body: str) -> list[str]:
+    return re.findall(r'<h5 class="card-title mb-1">([^<]+)</h5>', body)
+
+
+def _link(body: str, name: str) -> str | None:
+    match = re.search(rf'href="(/\?{name}=[^"]+)"', body)
+    return html.unescape(match.group(1)) if match else None
+
+
+def test_cursor_round_trip():
+    values = (datetime(2026, 10, 16, 19, 30), 42)
+
+    assert decode_cursor(encode_cursor(values), KEYS) == values
+
+
+@pytest.mark.parametrize("payload", [[{}, 1], ["2026-10-16T19:30:00", "42"], ["2026-10-16T19:30:00"], "x"])
+def test_wrong_type_cursor_values_are_rejected(payload):
+    cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+    assert decode_cursor(cursor, KEYS) is None
+
+
+@pytest.mark.parametrize("name", ["after", "before", "past_after", "past_before"])
+def test_tampered_cursor_shows_the_first_page(client, titles, name):
+    cursor = base64.urlsafe_b64encode(json.dumps([{}, "2026-10-16T19:30:00", 1]).encode()).decode()
+
+    response = client.get(f"/?{name}={cursor}")
+
+    assert response.status_code == 200
+    assert _cards(response.get_data(as_text=True)) == titles[:2]
+
+
+def test_paging_across_the_group_boundary_visits_every_event_once(client, titles):
+    pages, url = [], "/"
+    while url:
+        body = client.get(url).get_data(as_text=True)
+        pages.append(_cards(body))
+        url = _link(body, "after")
+
+    # The middle page ends the open group and starts the sold-out one.
+    assert pages == [titles[0:2], titles[2:4], titles[4:6]]
+
+    seen = pages[-1]
+    url = _link(body, "before")
+    while url:
+        body = client.get(url).get_data(as_text=True)
+        seen = _cards(body) + seen
+        url = _link(body, "before")
+    assert seen == titles
+
+
+def test_featured_falls_back_to_the_most_recent_past_events(client, event_factory):
+    for title, days in [("Oldest", -30), ("Recent", -2), ("Older", -10), ("Latest", -1)]:
+        event_factory(title, days=days)
+
+    body = client.get("/").get_data(as_text=True)
+
+    # Past events are listed most recent first, and the carousel shows the top of that list.
+    assert re.findall(r'<h2 class="fw-bold">([^<]+)</h2>', body) == ["Latest", "Recent"]
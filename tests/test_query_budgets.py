@@ -0,0 +1,109 @@
+"""Per-endpoint statement budgets (``QUERY_BUDGETS``) checked with ``QUERY_DEBUG`` on."""
+
+from __future__ import annotations
+
+import re
+
+import pytest
+
+from website import db
+from website.comments import comment_page
+from website.models import Comment, Order
+from website.querylog import assert_max_queries
+
+@pytest.fixture
+def app_config():
+    # Budgets are enforced in after_request and raise because TESTING is set.
+    return {"QUERY_DEBUG": True, "EVENTS_PER_PAGE": 3, "LISTING_CACHE_SIZE": 0}
+
+
+@pytest.fixture
+def event_id(app, owner, event_factory):
+    # Two open and two sold-out upcoming events, so the first upcoming page
+    # crosses from the open group into the rest; plus some past events.
+    fields = {"category": "Rock", "description": "Live music."}
+    event_ids = [
+        event_factory("Rock Opening", days=3, **fields),
+        event_factory("Rock Encore", days=5, **fields),
+        event_factory("Rock Sellout", days=1, status="Sold Out", **fields),
+        event_factory("Rock Finale", days=7, status="Sold Out", **fields),
+        event_factory("Rock Archive", days=-10, **fields),
+        event_factory("Rock History", days=-20, **fields),
+    ]
+    with app.app_context():
+        db.session.add_all(
+            [Comment(body=f"Comment {number}", user_id=owner, event_id=event_ids[0]) for number in range(5)]
+            + [Order(event_id=event_id, user_id=owner, ticket_type="general", quantity=1) for event_id in event_ids]
+        )
+        db.session.commit()
+    return event_ids[0]
+
+
+def _query_count(app, response, endpoint: str) -> int:
+    count = int(response.headers["X-Query-Count"])
+    assert count <= app.config["QUERY_BUDGETS"][endpoint]
+    return count
+
+
+@pytest.mark.parametrize("query", ["", "?q=rock", "?genre=Rock"])
+def test_index_stays_within_budget(app, client, event_id, query):
+    response = client.get(f"/{query}")
+
+    assert response.status_code == 200
+    assert _query_count(app, response, "main.index") == 3
+    assert b"Rock Opening" in response.data and b"Rock Sellout" in response.data
+    assert b"Rock Finale" not in response.data.split(b"Past Events")[0]
+
+
+def test_later_index_pages_stay_within_budget(app, client, event_id):
+    response = client.get("/")
+    next_page = re.search(r'href="(/\?after=[^"]+)"', response.get_data(as_text=True)).group(1)
+
+    response = client.get(next_page)
+
+    assert response.status_code == 200
+    assert _query_count(app, response, "main.index") == 3
+    assert b"Rock Finale" in response.data
+
+
+def test_event_page_stays_within_budget(app, client, login, event_id):
+    login()
+
+    response = client.get(f"/events/{event_id}")
+
+    assert response.status_code == 200
+    _query_count(app, response, "main.event")
+
+
+def test_comment_pages_stay_within_budget(app, client, event_id):
+    response = client.get(f"/events/{event_id}/comments")
+
+    assert response.status_code == 200
+    _query_count(app, response, "main.event_comments")
+
+
+def test_bookings_page_stays_within_budget(app, client, login, event_id):
+    login()
+
+    response = client.get("/bookings")
+
+    assert response.status_code == 200
+    _query_count(app, response, "main.bookings")
+
+
+def test_booking_stays_within_budget(app, client, login, event_id):
+    login()
+
+    response = client.post(f"/events/{event_id}/book", data={"ticket_type": "general", "quantity": 2})
+
+    assert response.status_code == 302
+    assert response.location.endswith("/bookings")
+    _query_count(app, response, "main.book_event")
+
+
+def test_comment_page_is_one_statement(app, event_id):
+    with app.test_request_context(), assert_max_queries(1) as log:
+        page = comment_page(event_id)
+
+    assert len(log) == 1
+    assert [comment.user.first_name for comment in page.items] == ["Owner"] * 5
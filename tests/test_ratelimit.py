@@ -0,0 +1,39 @@
+"""Token-bucket limits keyed on the client address behind a trusted proxy."""
+
+from __future__ import annotations
+
+import pytest
+
+
+@pytest.fixture
+def app_config():
+    return {
+        "PROXY_FIX_X_FOR": 1,
+        "RATE_LIMITS": {"login": {"ip": "2/minute", "user": "100/minute"}},
+    }
+
+
+def _login_attempt(client, forwarded_for: str, number: int):
+    return client.post("/login", data={
+        "login-email": f"user{number}@example.com", "login-password": "wrong",
+        "login-submit": "Log in",
+    }, headers={"X-Forwarded-For": forwarded_for})
+
+
+def test_spoofed_forwarded_for_does_not_reset_the_limit(client):
+    # The proxy appends the real client address; the entries before it are the client's own.
+    statuses = [
+        _login_attempt(client, f"198.51.100.{number}, 203.0.113.7", number).status_code
+        for number in range(3)
+    ]
+
+    assert 429 not in statuses[:2]
+    assert statuses[2] == 429
+
+
+def test_clients_behind_the_proxy_have_their_own_buckets(client):
+    for number in range(2):
+        _login_attempt(client, "203.0.113.7", number)
+
+    assert _login_attempt(client, "203.0.113.7", 2).status_code == 429
+    assert _login_attempt(client, "203.0.113.8", 3).status_code != 429
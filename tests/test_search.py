@@ -0,0 +1,41 @@
+"""Full-text search on the home page listing."""
+
+from __future__ import annotations
+
+import re
+
+import pytest
+
+
+@pytest.fixture
+def app_config():
+    return {"EVENTS_PER_PAGE": 2, "LISTING_CACHE_SIZE": 0}
+
+
+@pytest.fixture
+def events(event_factory):
+    specs = [
+        ("Quiet Evening", "Some jazz later."),
+        ("Poetry Slam", "No music at all."),
+        ("Jazz Night", "Jazz standards all night."),
+        ("Late Set", "Ends with jazz."),
+    ]
+    for offset, (title, description) in enumerate(specs, start=1):
+        event_factory(title, days=offset, description=description, category="Music")
+
+
+def _titles(html: str) -> list[str]:
+    """Titles of the upcoming event cards, in page order."""
+    upcoming = html.split("Past Events")[0]
+    return re.findall(r'<h5 class="card-title mb-1">([^<]+)</h5>', upcoming)
+
+
+def test_search_lists_best_matches_first_across_pages(client, events):
+    first = client.get("/?q=jazz").get_data(as_text=True)
+    next_cursor = first.split('href="/?q=jazz&amp;after=', 1)[1].split('"', 1)[0]
+    second = client.get(f"/?q=jazz&after={next_cursor}").get_data(as_text=True)
+
+    # The title match outranks an earlier event that only mentions the term, and
+    # the remaining match is on the next page rather than dropped.
+    assert _titles(first) == ["Jazz Night", "Quiet Evening"]
+    assert _titles(second) == ["Late Set"]
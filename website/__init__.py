@@ -1,64 +1,233 @@
-# import flask - from 'package' import 'Class'
+# import flask - from 'package' import 'Class'
 from flask import Flask
-try:
-    from bootstrap_flask import Bootstrap5
-except ModuleNotFoundError:
-    Bootstrap5 = None
-from flask_sqlalchemy import SQLAlchemy
-from flask_login import LoginManager
-
-db = SQLAlchemy()
-
-# create a function that creates a web application
-# a web server will run this web application
+try:
+    from bootstrap_flask import Bootstrap5
+except ModuleNotFoundError:
+    Bootstrap5 = None
+from flask_sqlalchemy import SQLAlchemy
+from flask_login import LoginManager
+
+from .routing import RoutingSession
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+# create a function that creates a web application
+# a web server will run this web application
 def create_app(config: dict | None = None):
     # Construct the Flask application and register extensions/blueprints.
 
     app = Flask(__name__)  # this is the name of the module/package that is calling this app
+    from .engine import DEFAULT_PRAGMAS as DEFAULT_SQLITE_PRAGMAS
+    from .passwords import DEFAULT_PROFILES as DEFAULT_PASSWORD_PROFILES
+    from .images import DEFAULT_SIZES as DEFAULT_IMAGE_SIZES, DEFAULT_WIDTHS as DEFAULT_IMAGE_WIDTHS
     app.config.from_mapping(
         SECRET_KEY='somesecretkey',
         SQLALCHEMY_DATABASE_URI='sqlite:///sitedata.sqlite',
         SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        # Pragmas run on every SQLite connection (see website/engine.py); the
+        # effective values are logged at startup when the check is enabled.
+        SQLITE_PRAGMAS=dict(DEFAULT_SQLITE_PRAGMAS),
+        SQLITE_PRAGMAS_CHECK=True,
+        # Send GET/HEAD queries to a read engine (see website/routing.py):
+        # READ_REPLICA_URI, or a read-only pool on the primary SQLite file.
+        READ_ROUTING_ENABLED=False,
+        READ_REPLICA_URI=None,
+        READ_YOUR_WRITES_SECONDS=0,
+        # Queued booking (see website/booking_queue.py): one writer thread applies
+        # up to BATCH_SIZE bookings per transaction; requests wait WAIT seconds
+        # for the outcome before being shown as pending on /bookings; outcomes
+        # not collected there are dropped RESULT_TTL seconds after resolving.
+        BOOKING_QUEUE_ENABLED=False,
+        BOOKING_QUEUE_BATCH_SIZE=50,
+        BOOKING_QUEUE_MAX_DEPTH=1000,
+        BOOKING_QUEUE_LINGER=0.005,
+        BOOKING_QUEUE_WAIT=2.0,
+        BOOKING_QUEUE_RESULT_TTL=900,
+        # In-memory seat holds (see website/inventory.py): opening the booking
+        # form holds HOLD_QUANTITY seat(s) for HOLD_SECONDS.
+        INVENTORY_HOLDS_ENABLED=False,
+        INVENTORY_HOLD_QUANTITY=1,
+        INVENTORY_HOLD_SECONDS=120,
+        INVENTORY_REFRESH_SECONDS=30,
+        INVENTORY_SWEEP_INTERVAL=5,
+        # Number of reverse proxies in front of the app that append to
+        # X-Forwarded-For. With N > 0, request.remote_addr is the address the
+        # outermost trusted proxy saw; entries a client adds itself are ignored.
+        PROXY_FIX_X_FOR=0,
+        # Token-bucket limits on POSTs (see website/ratelimit.py), per client IP
+        # and per user. RATE_LIMIT_STORAGE is an SQLite file shared by workers;
+        # None keeps buckets in process memory.
+        RATE_LIMIT_ENABLED=True,
+        RATE_LIMIT_STORAGE=None,
+        RATE_LIMITS={
+            'booking': {'ip': '30/minute', 'user': '10/minute'},
+            'comment': {'ip': '20/minute', 'user': '5/minute'},
+            'login': {'ip': '20/minute', 'user': '5/minute'},
+        },
+        # Load shedding: 503 once this many requests are in flight (0 disables),
+        # or bookings while the booking queue is at least this full.
+        LOAD_SHED_MAX_CONCURRENT=0,
+        LOAD_SHED_QUEUE_SATURATION=0.9,
+        LOAD_SHED_RETRY_AFTER=5,
+        # Resized event artwork (see website/images.py), written to
+        # IMAGE_DERIVATIVE_DIR (None: <instance>/derived-images) and served at
+        # IMAGE_DERIVATIVE_URL; widths and `sizes` are per variant.
+        IMAGE_DERIVATIVES_ENABLED=True,
+        IMAGE_DERIVATIVE_DIR=None,
+        IMAGE_DERIVATIVE_URL='/media/images',
+        IMAGE_DERIVATIVE_WIDTHS=dict(DEFAULT_IMAGE_WIDTHS),
+        IMAGE_DERIVATIVE_SIZES=dict(DEFAULT_IMAGE_SIZES),
+        IMAGE_DERIVATIVE_QUALITY=80,
+        # Serve static files through the `flask build-assets` manifest: hashed
+        # names, precompressed variants and ASSET_MAX_AGE immutable caching.
+        ASSET_FINGERPRINTING=True,
+        ASSET_DIST_DIR='dist',
+        ASSET_MAX_AGE=365 * 24 * 3600,
+        # Gzip HTML responses of at least this many bytes (0 disables).
+        GZIP_MIN_SIZE=1024,
+        GZIP_LEVEL=6,
+        # Rows fetched per round trip by the streamed attendee exports.
+        EXPORT_BATCH_SIZE=1000,
+        # Page sizes for the home page sections, event comments and bookings.
+        EVENTS_PER_PAGE=12,
+        COMMENTS_PER_PAGE=20,
+        BOOKINGS_PER_PAGE=12,
+        # Cache resolved users between requests instead of querying per request.
+        USER_CACHE_ENABLED=True,
+        USER_CACHE_SIZE=1024,
+        USER_CACHE_TTL=300,
+        # Password hashing cost; see website/passwords.py for the profiles.
+        PASSWORD_HASH_PROFILE='default',
+        PASSWORD_HASH_PROFILES=dict(DEFAULT_PASSWORD_PROFILES),
+        # Home page listing cache: number of filter combinations kept and the
+        # maximum age in seconds (0 entries disables the cache).
+        LISTING_CACHE_SIZE=256,
+        LISTING_CACHE_TTL=60,
+        # Rendered event cards kept in memory (0 disables fragment caching).
+        FRAGMENT_CACHE_SIZE=2048,
+        # Prometheus metrics at /metrics. Set METRICS_DIR to a directory shared
+        # by all workers on the host to aggregate their counters; snapshots are
+        # rewritten at most every METRICS_FLUSH_INTERVAL seconds per worker and
+        # those of exited workers are pruned on scrape.
+        # Scrapes must come from METRICS_ALLOWED_IPS or send
+        # "Authorization: Bearer <METRICS_TOKEN>"; others get a 404.
+        METRICS_ENABLED=True,
+        METRICS_TOKEN=None,
+        METRICS_ALLOWED_IPS=('127.0.0.1', '::1'),
+        METRICS_DIR=None,
+        METRICS_FLUSH_INTERVAL=5,
+        # Development/test SQL checks (see website/querylog.py). QUERY_DEBUG_RAISE
+        # defaults to TESTING; budgets are the statement limits per endpoint.
+        QUERY_DEBUG=False,
+        QUERY_DEBUG_RAISE=None,
+        QUERY_REPEAT_THRESHOLD=3,
+        QUERY_BUDGETS={
+            'main.index': 3,
+            'main.event': 4,
+            'main.event_comments': 3,
+            'main.bookings': 3,
+            'main.book_event': 6,
+            'main.add_comment': 6,
+        },
     )
     if config:
         app.config.update(config)
+    if app.config['PROXY_FIX_X_FOR']:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
+    from . import routing
+    routing.configure(app)
     # initialise db with flask app
     db.init_app(app)
 
-    if Bootstrap5:
-        Bootstrap5(app)
-    
-    # initialise the login manager
-    login_manager = LoginManager()
-    
-    # set the name of the login function that lets user login
-    # in our case it is auth.login (blueprintname.viewfunction name)z
-    login_manager.login_view = 'auth.login'
-    login_manager.init_app(app)
-
-    # create a user loader function takes userid and returns User
-    # Importing inside the create_app function avoids circular references
-    from .models import User
-    @login_manager.user_loader
-    def load_user(user_id):
-       return db.session.scalar(db.select(User).where(User.id==user_id))
-
-    from . import views
-    app.register_blueprint(views.main_bp)
-
-    try:
-        from . import auth
-    except ModuleNotFoundError as exc:  # dependency missing; run without auth routes
-        app.logger.warning("Skipping auth blueprint because '%s' is not available", exc.name)
+    from . import engine
+    engine.init_app(app)
+    routing.init_app(app)
+
+    from .cache import TTLCache
+    app.extensions['listing_cache'] = TTLCache(app.config['LISTING_CACHE_SIZE'])
+    app.extensions['fragment_cache'] = TTLCache(app.config['FRAGMENT_CACHE_SIZE'])
+
+    from .fragments import cache_fragment
+    app.jinja_env.globals['cache_fragment'] = cache_fragment
+
+    from . import images
+    images.init_app(app)
+
+    from . import assets, compression
+    assets.init_app(app)
+    compression.init_app(app)
+
+    if Bootstrap5:
+        Bootstrap5(app)
+    
+    # initialise the login manager
+    login_manager = LoginManager()
+    
+    # set the name of the login function that lets user login
+    # in our case it is auth.login (blueprintname.viewfunction name)z
+    login_manager.login_view = 'auth.login'
+    login_manager.init_app(app)
+
+    # create a user loader function takes userid and returns User
+    # Importing inside the create_app function avoids circular references
+    from .models import User
+    if app.config['USER_CACHE_ENABLED']:
+        from .identity import UserIdentityCache
+        app.extensions['user_cache'] = UserIdentityCache(
+            app.config['USER_CACHE_SIZE'], app.config['USER_CACHE_TTL']
+        )
+
+    @login_manager.user_loader
+    def load_user(user_id):
+       user_cache = app.extensions.get('user_cache')
+       if user_cache is not None:
+           return user_cache.load(user_id)
+       return db.session.scalar(db.select(User).where(User.id==user_id))
+
+    from . import views
+    app.register_blueprint(views.main_bp)
+
+    try:
+        from . import auth
+    except ModuleNotFoundError as exc:  # dependency missing; run without auth routes
+        app.logger.warning("Skipping auth blueprint because '%s' is not available", exc.name)
     else:
         app.register_blueprint(auth.auth_bp)
 
+    from . import commands
+    commands.init_app(app)
+
+    if app.config['METRICS_ENABLED']:
+        from . import metrics
+        metrics.init_app(app)
+
+    from . import querylog
+    querylog.init_app(app)
+
+    from . import booking_queue
+    booking_queue.init_app(app)
+
+    from . import inventory
+    inventory.init_app(app)
+
+    from . import ratelimit
+    ratelimit.init_app(app)
+
     from flask import render_template
 
     @app.errorhandler(404)
     def not_found(error):
         return render_template('errors/404.html'), 404
 
+    @app.errorhandler(429)
+    def too_many_requests(error):
+        return render_template('errors/429.html', retry_after=error.retry_after), 429, error.get_headers()
+
+    @app.errorhandler(503)
+    def service_unavailable(error):
+        return render_template('errors/503.html', retry_after=error.retry_after), 503, error.get_headers()
+
     @app.errorhandler(500)
     def server_error(error):
         app.logger.error("Unhandled exception: %s", error)
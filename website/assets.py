@@ -0,0 +1,155 @@
+"""Fingerprinted, precompressed static assets.
+
+``flask build-assets`` copies every file under ``static/`` to
+``static/<ASSET_DIST_DIR>/`` with a content hash in its name (``styles.css`` ->
+``styles.3f2a9c1b0d4e.css``), writes ``.gz`` and ``.br`` siblings for text
+assets, and records the mapping in ``manifest.json``. ``brotli`` is in
+requirements.txt; without it only ``.gz`` files are written and the command
+warns.
+
+At runtime ``url_for('static', filename='style/styles.css')`` resolves to the
+fingerprinted copy whenever the manifest knows the file, and the static view
+serves the best precompressed variant the client accepts. Fingerprinted files
+never change under the same URL, so they are sent with a one-year
+``immutable`` ``Cache-Control``. Rebuild
+after changing a static file; unknown files are served as before.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+
+from flask import Flask, current_app, request, send_from_directory
+
+try:
+    import brotli
+except ModuleNotFoundError:  # only gzip variants are produced without it
+    brotli = None
+
+MANIFEST_NAME = 'manifest.json'
+# Text formats worth compressing; images and fonts are already compressed.
+COMPRESSIBLE_EXTENSIONS = frozenset({'.css', '.js', '.mjs', '.map', '.json', '.svg', '.txt', '.xml', '.ico'})
+# Preference order when the client accepts several encodings.
+_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def _fingerprinted_name(path: str, digest: str) -> str:
+    stem, extension = os.path.splitext(path)
+    return f'{stem}.{digest}{extension}'
+
+
+def _source_files(static_folder: str, skip: set[str]):
+    for root, directories, files in os.walk(static_folder):
+        relative_root = os.path.relpath(root, static_folder).replace(os.sep, '/')
+        relative_root = '' if relative_root == '.' else f'{relative_root}/'
+        directories[:] = sorted(
+            name for name in directories if f'{relative_root}{name}' not in skip
+        )
+        for name in sorted(files):
+            yield f'{relative_root}{name}'
+
+
+def _compressed_variants(data: bytes) -> dict[str, bytes]:
+    variants = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(data, quality=11)
+    # A variant that does not save anything is not worth a second lookup.
+    return {suffix: body for suffix, body in variants.items() if len(body) < len(data)}
+
+
+def build_assets(app: Flask) -> dict:
+    """Rebuild ``static/<ASSET_DIST_DIR>`` and its manifest; returns the manifest."""
+    static_folder = app.static_folder
+    dist_dir = app.config['ASSET_DIST_DIR']
+    dist_path = os.path.join(static_folder, dist_dir)
+    skip = {dist_dir}
+
+    manifest = {}
+    written = {MANIFEST_NAME}
+    for source in _source_files(static_folder, skip):
+        with open(os.path.join(static_folder, source), 'rb') as handle:
+            data = handle.read()
+        target = _fingerprinted_name(source, hashlib.sha256(data).hexdigest()[:12])
+        target_path = os.path.join(dist_path, target)
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        if not os.path.exists(target_path):
+            shutil.copyfile(os.path.join(static_folder, source), target_path)
+        written.add(target)
+        encodings = []
+        if os.path.splitext(source)[1].lower() in COMPRESSIBLE_EXTENSIONS:
+            for suffix, body in _compressed_variants(data).items():
+                with open(target_path + suffix, 'wb') as handle:
+                    handle.write(body)
+                written.add(target + suffix)
+                encodings.append(suffix)
+        manifest[source] = {'path': target, 'encodings': sorted(encodings)}
+
+    for stale in _source_files(dist_path, set()):
+        if stale not in written:
+            os.remove(os.path.join(dist_path, stale))
+    with open(os.path.join(dist_path, MANIFEST_NAME), 'w', encoding='utf-8') as handle:
+        json.dump(manifest, handle, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(app: Flask) -> dict:
+    path = os.path.join(app.static_folder, app.config['ASSET_DIST_DIR'], MANIFEST_NAME)
+    try:
+        with open(path, encoding='utf-8') as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return {}
+
+
+def _is_immutable(filename: str) -> bool:
+    prefix = f"{current_app.config['ASSET_DIST_DIR']}/"
+    return filename.startswith(prefix) and not filename.endswith(MANIFEST_NAME)
+
+
+def serve_static(filename: str):
+    """Static view that picks a precompressed variant and marks hashed files immutable."""
+    app = current_app._get_current_object()
+    encodings = app.extensions['asset_encodings'].get(filename, ())
+    for encoding, suffix in _ENCODINGS:
+        if suffix in encodings and encoding in request.accept_encodings:
+            mimetype, _ = mimetypes.guess_type(filename)
+            response = send_from_directory(
+                app.static_folder, filename + suffix, mimetype=mimetype or 'application/octet-stream'
+            )
+            response.headers['Content-Encoding'] = encoding
+            break
+    else:
+        response = app.send_static_file(filename)
+    if encodings:
+        response.vary.add('Accept-Encoding')
+    if _is_immutable(filename):
+        response.cache_control.public = True
+        response.cache_control.max_age = app.config['ASSET_MAX_AGE']
+        response.cache_control.immutable = True
+        response.cache_control.no_cache = None
+    return response
+
+
+def init_app(app: Flask) -> None:
+    """Point ``url_for('static')`` at fingerprinted copies and install the static view."""
+    if not app.config['ASSET_FINGERPRINTING'] or not app.has_static_folder:
+        return
+    manifest = load_manifest(app)
+    dist_dir = app.config['ASSET_DIST_DIR']
+    app.extensions['asset_manifest'] = manifest
+    app.extensions['asset_encodings'] = {
+        f"{dist_dir}/{entry['path']}": tuple(entry['encodings']) for entry in manifest.values()
+    }
+    app.view_functions['static'] = serve_static
+
+    @app.url_defaults
+    def fingerprint_static_urls(endpoint, values):
+        if endpoint == 'static' and 'filename' in values:
+            entry = manifest.get(values['filename'])
+            if entry is not None:
+                values['filename'] = f"{dist_dir}/{entry['path']}"
@@ -1,15 +1,23 @@
-from flask import Blueprint, flash, render_template, request, url_for, redirect
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask import Blueprint, current_app, flash, render_template, request, url_for, redirect
 from flask_login import login_user, login_required, logout_user, current_user
 from .models import User
 from .forms import LoginForm, RegisterForm
+from .passwords import hash_password, needs_rehash, verify_password
+from .ratelimit import rate_limit
 from . import db
 
 # Create a blueprint - make sure all BPs have unique names
 auth_bp = Blueprint('auth', __name__)
 
+def _submitted_email():
+    # Per-account key for login throttling: the email being signed in or registered.
+    email = request.form.get('login-email') or request.form.get('register-email') or ''
+    return email.strip().lower() or None
+
+
 # this is a hint for a login function
 @auth_bp.route('/login', methods=['GET', 'POST'])
+@rate_limit('login', user_key=_submitted_email)
 def login():
     # Handle both login and registration form submissions.
     login_form = LoginForm(prefix='login')
@@ -29,7 +37,7 @@ def login():
                 if existing_user:
                     flash('An account with that email already exists.', 'danger')
                 else:
-                    password_hash = generate_password_hash(register_form.password.data)
+                    password_hash = hash_password(register_form.password.data)
                     new_user = User(
                         first_name=register_form.first_name.data,
                         last_name=register_form.last_name.data,
@@ -57,9 +65,13 @@ def login():
                 user = db.session.scalar(db.select(User).where(User.email == email))
                 if user is None:
                     flash('No account found with that email address.', 'danger')
-                elif not check_password_hash(user.password_hash, password):
+                elif not verify_password(user.password_hash, password):
                     flash('Incorrect password', 'danger')
                 else:
+                    if needs_rehash(user.password_hash):
+                        # Upgrade hashes made under an older cost profile.
+                        user.password_hash = hash_password(password)
+                        db.session.commit()
                     login_user(user)
                     next_url = request.args.get('next')
                     if not next_url or not next_url.startswith('/'):
@@ -82,6 +94,9 @@ def login():
 @login_required
 def logout():
     # Log the current user out and redirect to home.
+    user_cache = current_app.extensions.get('user_cache')
+    if user_cache is not None:
+        user_cache.invalidate(current_user.id)
     logout_user()
     flash('You have been logged out.', 'info')
     return redirect(url_for('main.index'))
@@ -0,0 +1,152 @@
+"""Ticket booking engine that keeps the denormalised sold counters on Event in sync."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import and_, case, func
+
+from . import db
+from .models import CatalogueState, Event, Order
+
+BOOKED = 'booked'
+SOLD_OUT = 'sold_out'
+UNAVAILABLE = 'unavailable'
+# Rejected before reaching the database (malformed quantity or ticket type).
+INVALID = 'invalid'
+
+
+@dataclass(frozen=True)
+class BookingResult:
+    """Outcome of a reservation attempt."""
+
+    status: str
+    order_id: int | None = None
+    remaining: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.status == BOOKED
+
+
+def _sold_and_capacity(ticket_type: str):
+    """Return the (sold, capacity) column pair for a ticket type."""
+    if ticket_type == 'vip':
+        return Event.vip_sold, Event.vip_capacity
+    return Event.general_sold, Event.general_capacity
+
+
+def is_closed(event: Event | None) -> bool:
+    """True when ``event`` takes no bookings at all (missing, cancelled or over)."""
+    return event is None or event.is_expired or event.status.lower() == 'cancelled'
+
+
+def rejection(event: Event | None, ticket_type: str, quantity: int) -> BookingResult:
+    """Classify why ``quantity`` tickets of ``ticket_type`` cannot be booked for ``event``."""
+    if is_closed(event):
+        return BookingResult(UNAVAILABLE)
+    remaining = event.vip_remaining_tickets if ticket_type == 'vip' else event.general_remaining_tickets
+    # Capacity is the reason whether too few seats are left or the event was
+    # flipped to 'Sold Out' (by an earlier booking's UPDATE or by its owner).
+    if remaining < quantity or event.status.lower() == 'sold out':
+        return BookingResult(SOLD_OUT, remaining=remaining)
+    return BookingResult(UNAVAILABLE, remaining=remaining)
+
+
+def apply_reservation(event_id: int, user_id: int, ticket_type: str, quantity: int,
+                      now: datetime | None = None) -> BookingResult:
+    """Claim the seats and add the order inside the caller's transaction.
+
+    The capacity check lives inside the UPDATE's WHERE clause, so two concurrent
+    requests can never both claim the last seats: the loser simply matches zero
+    rows and nothing is changed. The automatic 'Sold Out' flip is folded into the
+    same statement. Nothing is committed, so several reservations can share one
+    transaction; the caller bumps the catalogue version and commits.
+    """
+    sold, capacity = _sold_and_capacity(ticket_type)
+    other_sold, other_capacity = _sold_and_capacity('general' if ticket_type == 'vip' else 'vip')
+    now = now or datetime.utcnow()
+
+    result = db.session.execute(
+        db.update(Event)
+        .where(
+            Event.id == event_id,
+            sold + quantity <= capacity,
+            func.lower(Event.status).not_in(('cancelled', 'sold out')),
+            Event.end_time >= now,
+        )
+        .values({
+            sold: sold + quantity,
+            Event.version: Event.version + 1,
+            Event.updated_at: now,
+            Event.status: case(
+                (and_(sold + quantity >= capacity, other_sold >= other_capacity), 'Sold Out'),
+                else_=Event.status,
+            ),
+        })
+        .execution_options(synchronize_session=False)
+    )
+
+    if result.rowcount == 0:
+        return rejection(db.session.get(Event, event_id, populate_existing=True), ticket_type, quantity)
+
+    order = Order(user_id=user_id, event_id=event_id, quantity=quantity, ticket_type=ticket_type)
+    db.session.add(order)
+    db.session.flush()
+    return BookingResult(BOOKED, order_id=order.id)
+
+
+def reserve_tickets(event_id: int, user_id: int, ticket_type: str, quantity: int) -> BookingResult:
+    """Atomically reserve ``quantity`` tickets and record the order in one transaction.
+
+    The UPDATE in :func:`apply_reservation` is the first statement of the
+    transaction, so SQLite takes the write lock once and holds it only until the
+    Order insert commits.
+    """
+    result = apply_reservation(event_id, user_id, ticket_type, quantity)
+    if not result.ok:
+        db.session.rollback()
+        return result
+    CatalogueState.bump()
+    db.session.commit()
+    return result
+
+
+def reconcile_ticket_counts() -> int:
+    """Recompute ``general_sold``/``vip_sold`` from the Order table.
+
+    Totals for every event are aggregated in a single GROUP BY and only rows whose
+    stored counters drifted are rewritten. Returns the number of events corrected.
+    """
+    totals = {
+        event_id: (general or 0, vip or 0)
+        for event_id, general, vip in db.session.execute(
+            db.select(
+                Order.event_id,
+                func.sum(case((Order.ticket_type == 'general', Order.quantity), else_=0)),
+                func.sum(case((Order.ticket_type == 'vip', Order.quantity), else_=0)),
+            ).group_by(Order.event_id)
+        )
+    }
+
+    now = datetime.utcnow()
+    corrections = []
+    for event_id, general_sold, vip_sold, version in db.session.execute(
+        db.select(Event.id, Event.general_sold, Event.vip_sold, Event.version)
+    ):
+        expected_general, expected_vip = totals.get(event_id, (0, 0))
+        if (general_sold, vip_sold) != (expected_general, expected_vip):
+            corrections.append({
+                'id': event_id,
+                'general_sold': expected_general,
+                'vip_sold': expected_vip,
+                'version': version + 1,
+                'updated_at': now,
+            })
+
+    if corrections:
+        db.session.execute(db.update(Event), corrections)
+        CatalogueState.bump()
+    db.session.commit()
+    return len(corrections)
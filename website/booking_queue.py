@@ -0,0 +1,218 @@
+"""Single-writer queue that applies bookings in batched transactions.
+
+With ``BOOKING_QUEUE_ENABLED``, ``book_event`` hands reservations to one worker
+thread per process instead of opening its own write transaction. The worker
+takes requests in arrival order, applies up to ``BOOKING_QUEUE_BATCH_SIZE`` of
+them with :func:`~website.booking.apply_reservation` and commits once, so an
+on-sale costs one SQLite write lock per batch rather than a lock fight per
+request. The request waits ``BOOKING_QUEUE_WAIT`` seconds for its result; if
+the batch has not committed by then, the booking is reported as pending and
+its outcome is shown on ``/bookings`` once it resolves.
+
+Queued bookings live in process memory: requests still waiting when the
+process exits are lost, and pending entries are only visible to requests
+served by the same worker process. Resolved entries nobody collected are
+dropped ``BOOKING_QUEUE_RESULT_TTL`` seconds after they resolve.
+"""
+
+from __future__ import annotations
+
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from flask import Flask, current_app
+
+from . import db
+from .booking import BookingResult, apply_reservation, reserve_tickets
+from .models import CatalogueState
+
+
+# Booking outcome recorded when a request is turned away by a full queue.
+QUEUE_FULL = 'queue_full'
+
+
+class QueueFull(Exception):
+    """The booking queue already holds ``BOOKING_QUEUE_MAX_DEPTH`` requests."""
+
+
+@dataclass
+class PendingBooking:
+    """A queued reservation and the future its HTTP request is waiting on."""
+
+    ticket: int
+    event_id: int
+    user_id: int
+    ticket_type: str
+    quantity: int
+    event_title: str = ''
+    submitted_at: datetime = field(default_factory=datetime.utcnow)
+    future: Future = field(default_factory=Future)
+    # time.monotonic() when the outcome was set; 0 while still queued.
+    resolved_at: float = 0.0
+
+
+class BookingQueue:
+    """Per-process booking writer; the thread starts with the first submission."""
+
+    def __init__(self, app: Flask, batch_size: int, max_depth: int, linger: float,
+                 result_ttl: float = 900):
+        self.app = app
+        self.batch_size = batch_size
+        self.linger = linger
+        self.result_ttl = result_ttl
+        self._next_sweep = 0.0
+        self._queue: queue.Queue[PendingBooking] = queue.Queue(max_depth)
+        self._tickets = itertools.count(1)
+        self._pending: dict[int, list[PendingBooking]] = {}
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def saturation(self) -> float:
+        """Fraction of the queue capacity in use (0 when unbounded)."""
+        return self._queue.qsize() / self._queue.maxsize if self._queue.maxsize else 0.0
+
+    def submit(self, event_id: int, user_id: int, ticket_type: str, quantity: int,
+               event_title: str = '') -> PendingBooking:
+        """Queue a reservation; raises :class:`QueueFull` when saturated."""
+        pending = PendingBooking(next(self._tickets), event_id, user_id, ticket_type, quantity, event_title)
+        self._ensure_worker()
+        with self._lock:
+            self._sweep()
+            self._pending.setdefault(user_id, []).append(pending)
+        try:
+            self._queue.put_nowait(pending)
+        except queue.Full:
+            self.forget(pending)
+            raise QueueFull() from None
+        return pending
+
+    def take_pending(self, user_id: int) -> tuple[list[PendingBooking], list[PendingBooking]]:
+        """Return (still queued, newly resolved) bookings for ``user_id``.
+
+        Resolved entries are handed out once and then forgotten.
+        """
+        with self._lock:
+            self._sweep()
+            entries = self._pending.pop(user_id, [])
+            waiting = [entry for entry in entries if not entry.future.done()]
+            if waiting:
+                self._pending[user_id] = waiting
+        return waiting, [entry for entry in entries if entry.future.done()]
+
+    def forget(self, pending: PendingBooking) -> None:
+        """Drop a booking whose outcome was already delivered to its request."""
+        with self._lock:
+            entries = self._pending.get(pending.user_id, [])
+            if pending in entries:
+                entries.remove(pending)
+            if not entries:
+                self._pending.pop(pending.user_id, None)
+
+    def _sweep(self) -> None:
+        """Drop entries resolved more than ``result_ttl`` seconds ago; call with the lock held.
+
+        Users who never open /bookings would otherwise keep their timed-out
+        bookings in memory for the life of the process. Runs at most once per
+        ``result_ttl`` (and at least once a minute) so submissions stay cheap.
+        """
+        now = time.monotonic()
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + min(self.result_ttl, 60)
+        cutoff = now - self.result_ttl
+        for user_id in list(self._pending):
+            entries = [
+                entry for entry in self._pending[user_id]
+                if not (entry.future.done() and entry.resolved_at <= cutoff)
+            ]
+            if entries:
+                self._pending[user_id] = entries
+            else:
+                del self._pending[user_id]
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='booking-writer', daemon=True)
+                self._thread.start()
+
+    def _next_batch(self) -> list[PendingBooking]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.linger
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            with self.app.app_context():
+                try:
+                    results = self._apply(batch)
+                except Exception:
+                    db.session.rollback()
+                    current_app.logger.exception('Batched booking failed; retrying %d request(s) singly', len(batch))
+                    results = self._apply_singly(batch)
+                finally:
+                    db.session.remove()
+                _resolve(batch, results)
+
+    def _apply(self, batch: list[PendingBooking]) -> list[BookingResult]:
+        """Apply the whole batch in one transaction."""
+        now = datetime.utcnow()
+        results = [
+            apply_reservation(pending.event_id, pending.user_id, pending.ticket_type, pending.quantity, now)
+            for pending in batch
+        ]
+        if any(result.ok for result in results):
+            CatalogueState.bump()
+            db.session.commit()
+        else:
+            db.session.rollback()
+        return results
+
+    def _apply_singly(self, batch: list[PendingBooking]) -> list:
+        results = []
+        for pending in batch:
+            try:
+                results.append(reserve_tickets(pending.event_id, pending.user_id, pending.ticket_type, pending.quantity))
+            except Exception as exc:
+                db.session.rollback()
+                results.append(exc)
+        return results
+
+
+def _resolve(batch: list[PendingBooking], results: list) -> None:
+    from .metrics import record_booking
+
+    for pending, result in zip(batch, results):
+        pending.resolved_at = time.monotonic()
+        if isinstance(result, Exception):
+            pending.future.set_exception(result)
+        else:
+            record_booking(result.status)
+            pending.future.set_result(result)
+
+
+def init_app(app: Flask) -> None:
+    """Create the application's booking queue when queued booking is enabled."""
+    if app.config['BOOKING_QUEUE_ENABLED']:
+        app.extensions['booking_queue'] = BookingQueue(
+            app,
+            batch_size=app.config['BOOKING_QUEUE_BATCH_SIZE'],
+            max_depth=app.config['BOOKING_QUEUE_MAX_DEPTH'],
+            linger=app.config['BOOKING_QUEUE_LINGER'],
+            result_ttl=app.config['BOOKING_QUEUE_RESULT_TTL'],
+        )
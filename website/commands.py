@@ -0,0 +1,152 @@
+"""Maintenance commands exposed through the ``flask`` CLI."""
+
+import os
+
+import click
+from flask import Flask
+
+
+@click.command('recount-tickets')
+def recount_tickets_command():
+    """Rebuild the per-event ticket counters from existing orders."""
+    from .booking import reconcile_ticket_counts
+
+    corrected = reconcile_ticket_counts()
+    click.echo(f"Reconciled ticket counters; {corrected} event(s) corrected.")
+
+
+@click.command('recount-comments')
+def recount_comments_command():
+    """Rebuild the cached per-event comment counts."""
+    from .comments import reconcile_comment_counts
+
+    corrected = reconcile_comment_counts()
+    click.echo(f"Reconciled comment counts; {corrected} event(s) corrected.")
+
+
+@click.command('rebuild-search-index')
+def rebuild_search_index_command():
+    """Create the event full-text index if needed and repopulate it."""
+    from .search import rebuild_search_index
+
+    rebuild_search_index()
+    click.echo("Rebuilt the event search index.")
+
+
+@click.group('schema')
+def schema_cli():
+    """Inspect and apply database schema migrations."""
+
+
+@schema_cli.command('status')
+def schema_status_command():
+    """List migrations and whether each has been applied."""
+    from .migrations import applied_versions, available_migrations
+
+    applied = applied_versions()
+    for version, name, _module in available_migrations():
+        marker = 'applied' if version in applied else 'pending'
+        click.echo(f"{version:04d} {name:<30} {marker}")
+
+
+@schema_cli.command('upgrade')
+@click.option('--target', type=int, default=None, help='Stop after this migration version.')
+def schema_upgrade_command(target):
+    """Apply pending migrations to the configured database in place."""
+    from .migrations import upgrade
+
+    applied = upgrade(target)
+    for version, name in applied:
+        click.echo(f"Applied {version:04d} {name}")
+    if not applied:
+        click.echo("Database schema is up to date.")
+
+
+@click.command('bench-password-hash')
+@click.option('--seconds', type=float, default=1.0, show_default=True, help='Time spent per profile.')
+def bench_password_hash_command(seconds):
+    """Report password hashes per second for each configured profile."""
+    from flask import current_app
+
+    from .passwords import benchmark
+
+    selected = current_app.config['PASSWORD_HASH_PROFILE']
+    for name, method in current_app.config['PASSWORD_HASH_PROFILES'].items():
+        marker = ' (active)' if name == selected else ''
+        click.echo(f"{name:<10} {method:<24} {benchmark(method, seconds):>10.1f} hashes/sec{marker}")
+
+
+@click.command('sqlite-pragmas')
+def sqlite_pragmas_command():
+    """Show the effective SQLite pragmas next to the configured profile."""
+    from flask import current_app
+
+    from . import db
+    from .engine import effective_pragmas, pragma_mismatches
+
+    requested = current_app.config['SQLITE_PRAGMAS']
+    effective = effective_pragmas(db.engine, requested)
+    mismatches = pragma_mismatches(requested, effective)
+    for name, value in effective.items():
+        marker = f' (requested {requested[name]})' if name in mismatches else ''
+        click.echo(f"{name:<14} {value}{marker}")
+
+
+@click.command('build-images')
+@click.option('--force', is_flag=True, help='Rebuild derivatives even for unchanged sources.')
+@click.option('--prune', is_flag=True, help='Delete derivative files the manifest no longer references.')
+def build_images_command(force, prune):
+    """Generate resized WebP/JPEG derivatives for every event image."""
+    from . import db
+    from .images import Image, build_derivatives, stale_derivatives, static_image_path
+    from .models import Event
+
+    if Image is None:
+        raise click.ClickException('Pillow is required to build image derivatives (pip install pillow).')
+    sources = {static_image_path(url) for url in db.session.scalars(db.select(Event.image_url).distinct())}
+    sources.discard(None)
+    built = skipped = 0
+    for source in sorted(sources):
+        entry = build_derivatives(source, force=force)
+        if entry is None:
+            skipped += 1
+            click.echo(f"Skipped {source} (missing or not an image)")
+        else:
+            built += 1
+    click.echo(f"Derivatives ready for {built} image(s); {skipped} skipped.")
+    if prune:
+        stale = stale_derivatives()
+        for path in stale:
+            os.remove(path)
+        click.echo(f"Removed {len(stale)} stale derivative file(s).")
+
+
+@click.command('build-assets')
+def build_assets_command():
+    """Fingerprint and precompress the static files into the dist directory."""
+    from flask import current_app
+
+    from .assets import brotli, build_assets
+
+    manifest = build_assets(current_app)
+    compressed = sum(1 for entry in manifest.values() if entry['encodings'])
+    click.echo(f"Fingerprinted {len(manifest)} file(s); {compressed} precompressed.")
+    if brotli is None:
+        click.echo(
+            "Warning: brotli is not installed, so no .br variants were written; "
+            "run `pip install -r requirements.txt`.",
+            err=True,
+        )
+    click.echo("Restart the application to serve the new manifest.")
+
+
+def init_app(app: Flask) -> None:
+    """Register the maintenance commands with the application CLI."""
+    app.cli.add_command(recount_tickets_command)
+    app.cli.add_command(recount_comments_command)
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(schema_cli)
+    app.cli.add_command(bench_password_hash_command)
+    app.cli.add_command(sqlite_pragmas_command)
+    app.cli.add_command(build_images_command)
+    app.cli.add_command(build_assets_command)
@@ -0,0 +1,52 @@
+"""Comment posting and paginated, author-eager-loaded comment listing."""
+
+from __future__ import annotations
+
+from flask import current_app
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+
+from . import db
+from .models import Comment, Event, User
+from .pagination import Page, paginate
+
+_COMMENT_ORDER = (Comment.created_at, Comment.id)
+
+
+def comment_page(event_id: int, after: str | None = None) -> Page:
+    """Newest-first page of comments for an event, authors joined in the same query."""
+    return paginate(
+        db.select(Comment).where(Comment.event_id == event_id).options(joinedload(Comment.user)),
+        _COMMENT_ORDER,
+        per_page=current_app.config['COMMENTS_PER_PAGE'],
+        after=after,
+        descending=True,
+    )
+
+
+def post_comment(event: Event, user: User, body: str) -> Comment:
+    """Add a comment and bump the event's cached count and version in one commit."""
+    comment = Comment(body=body, user_id=user.id, event_id=event.id)
+    db.session.add(comment)
+    event.comment_count = Event.comment_count + 1
+    event.touch()
+    db.session.commit()
+    return comment
+
+
+def reconcile_comment_counts() -> int:
+    """Recompute ``Event.comment_count`` with one GROUP BY; returns events corrected."""
+    totals = dict(db.session.execute(
+        db.select(Comment.event_id, func.count(Comment.id)).group_by(Comment.event_id)
+    ).all())
+    corrections = [
+        {'id': event_id, 'comment_count': totals.get(event_id, 0), 'version': version + 1}
+        for event_id, stored, version in db.session.execute(
+            db.select(Event.id, Event.comment_count, Event.version)
+        )
+        if stored != totals.get(event_id, 0)
+    ]
+    if corrections:
+        db.session.execute(db.update(Event), corrections)
+    db.session.commit()
+    return len(corrections)
@@ -0,0 +1,56 @@
+"""Gzip compression of dynamically rendered HTML.
+
+HTML responses of at least ``GZIP_MIN_SIZE`` bytes are gzip-encoded for clients
+that accept it. Streamed and file responses are left alone. A compressed
+response gets its entity tag suffixed with :data:`GZIP_ETAG_SUFFIX` so the
+gzip and identity bodies never share a strong validator; :mod:`website.conditional`
+accepts either form on revalidation.
+"""
+
+from __future__ import annotations
+
+import gzip
+
+from flask import Flask, request
+
+GZIP_ETAG_SUFFIX = '-gzip'
+
+
+def _restore_gzip_etag(response) -> None:
+    # A 304 must repeat the tag the client holds, which may be the gzip one.
+    etag, weak = response.get_etag()
+    if etag and request.if_none_match.contains_weak(etag + GZIP_ETAG_SUFFIX):
+        response.set_etag(etag + GZIP_ETAG_SUFFIX, weak)
+
+
+def init_app(app: Flask) -> None:
+    """Compress large HTML responses; a ``GZIP_MIN_SIZE`` of 0 disables it."""
+    min_size = app.config['GZIP_MIN_SIZE']
+    if not min_size:
+        return
+    level = app.config['GZIP_LEVEL']
+
+    @app.after_request
+    def gzip_html(response):
+        if response.status_code == 304:
+            _restore_gzip_etag(response)
+            return response
+        if (
+            response.mimetype != 'text/html'
+            or response.status_code < 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or 'gzip' not in request.accept_encodings
+        ):
+            return response
+        response.vary.add('Accept-Encoding')
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+        response.set_data(gzip.compress(data, compresslevel=level))
+        response.headers['Content-Encoding'] = 'gzip'
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(etag + GZIP_ETAG_SUFFIX, weak)
+        return response
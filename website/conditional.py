@@ -0,0 +1,54 @@
+"""HTTP conditional GET support (ETag / Last-Modified) for rendered pages.
+
+Views derive validators from cheap version columns, call :func:`conditional`
+with a render callback and get a bodiless 304 back when the client's copy is
+still current, so no template is rendered for a revalidation.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, timezone
+
+from flask import make_response, request
+
+from .compression import GZIP_ETAG_SUFFIX
+
+
+def make_etag(*parts) -> str:
+    """Build a strong entity tag from the values a page depends on."""
+    return hashlib.sha1(repr(parts).encode()).hexdigest()[:32]
+
+
+def _is_fresh(etag: str, last_modified: datetime | None) -> bool:
+    if request.if_none_match:
+        # The client may hold the gzip-encoded representation of the same page.
+        return request.if_none_match.contains_weak(etag) or request.if_none_match.contains_weak(
+            etag + GZIP_ETAG_SUFFIX
+        )
+    if last_modified is not None and request.if_modified_since is not None:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+
+def conditional(etag: str, last_modified: datetime | None, render, *, private: bool = False):
+    """Return a 304 if the client copy is fresh, otherwise ``render()`` with validators.
+
+    ``last_modified`` is a naive UTC datetime as stored by the models.
+    """
+    if last_modified is not None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+
+    if _is_fresh(etag, last_modified):
+        response = make_response('', 304)
+    else:
+        response = make_response(render())
+
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    if private:
+        response.cache_control.private = True
+    response.vary.add('Cookie')
+    return response
@@ -0,0 +1,116 @@
+"""SQLite connection tuning applied to every pooled connection.
+
+``SQLITE_PRAGMAS`` is executed on each new DB-API connection through the engine
+``connect`` event. The defaults put the database in WAL mode so readers never
+wait for the booking writer, let writers queue on the lock for up to five
+seconds instead of failing with "database is locked", and trade the per-commit
+fsync for one at checkpoint time (``synchronous=NORMAL`` is still durable
+against application crashes in WAL mode).
+"""
+
+from __future__ import annotations
+
+import re
+
+from flask import Flask
+from sqlalchemy import event
+
+from . import db
+
+DEFAULT_PRAGMAS = {
+    # busy_timeout comes first so the journal mode switch itself waits for locks.
+    'busy_timeout': 5000,
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,  # negative values are KiB: 64 MiB of page cache
+    'temp_store': 'MEMORY',
+}
+
+# Symbolic values SQLite reports back as integers.
+_ENUMS = {
+    'synchronous': {'off': 0, 'normal': 1, 'full': 2, 'extra': 3},
+    'temp_store': {'default': 0, 'file': 1, 'memory': 2},
+}
+_IDENTIFIER = re.compile(r'^[A-Za-z_]+$')
+
+
+def _pragma_statements(pragmas: dict) -> list[str]:
+    statements = []
+    for name, value in pragmas.items():
+        if not _IDENTIFIER.match(name):
+            raise ValueError(f'Invalid SQLite pragma name: {name!r}')
+        if isinstance(value, bool) or not isinstance(value, (int, str)) or (
+            isinstance(value, str) and not _IDENTIFIER.match(value)
+        ):
+            raise ValueError(f'Invalid value for SQLite pragma {name}: {value!r}')
+        statements.append(f'PRAGMA {name}={value}')
+    return statements
+
+
+def apply_pragmas(engine, pragmas: dict) -> None:
+    """Run ``pragmas`` on every new connection made by ``engine``."""
+    statements = _pragma_statements(pragmas)
+    if engine.dialect.name != 'sqlite' or not statements:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+def effective_pragmas(engine, names) -> dict:
+    """Read back the current value of each pragma in ``names``."""
+    with engine.connect() as connection:
+        return {
+            name: connection.exec_driver_sql(f'PRAGMA {name}').scalar()
+            for name in names
+            if _IDENTIFIER.match(name)
+        }
+
+
+def pragma_mismatches(requested: dict, effective: dict) -> dict:
+    """Pragmas whose effective value differs from the requested one."""
+    mismatches = {}
+    for name, wanted in requested.items():
+        actual = effective.get(name)
+        if isinstance(wanted, str):
+            wanted = _ENUMS.get(name, {}).get(wanted.lower(), wanted.lower())
+        if isinstance(actual, str):
+            actual = actual.lower()
+        if actual != wanted:
+            mismatches[name] = (requested[name], effective.get(name))
+    return mismatches
+
+
+def check_pragmas(app: Flask, engine) -> dict:
+    """Log the effective pragmas, warning about any SQLite did not accept.
+
+    In-memory databases cannot use WAL or mmap, for example, and some network
+    filesystems refuse WAL; the warning makes such silent downgrades visible.
+    """
+    requested = app.config['SQLITE_PRAGMAS']
+    effective = effective_pragmas(engine, requested)
+    app.logger.info('SQLite pragmas: %s', ', '.join(f'{name}={value}' for name, value in effective.items()))
+    for name, (wanted, actual) in pragma_mismatches(requested, effective).items():
+        app.logger.warning('SQLite pragma %s is %r, requested %r', name, actual, wanted)
+    return effective
+
+
+def init_app(app: Flask) -> None:
+    """Install the pragma profile on each of the application's SQLite engines."""
+    with app.app_context():
+        engine, engines = db.engine, list(db.engines.values())
+    for bound in engines:
+        pragmas = app.config['SQLITE_PRAGMAS']
+        if bound.url.query.get('mode') == 'ro':
+            # Read-only connections cannot switch the journal mode; they follow the file's.
+            pragmas = {name: value for name, value in pragmas.items() if name != 'journal_mode'}
+        apply_pragmas(bound, pragmas)
+    if app.config['SQLITE_PRAGMAS_CHECK'] and engine.dialect.name == 'sqlite':
+        check_pragmas(app, engine)
@@ -5,6 +5,7 @@ from wtforms.fields import (
     DateField,
     DecimalField,
     EmailField,
+    HiddenField,
     IntegerField,
     SelectField,
     StringField,
@@ -119,6 +120,8 @@ class BookingForm(FlaskForm):
         coerce=int,
         validators=[InputRequired()],
     )
+    # Seat hold placed when the form was rendered (see website/inventory.py).
+    hold_token = HiddenField()
     submit = SubmitField("Book Now")
 
 
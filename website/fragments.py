@@ -0,0 +1,19 @@
+"""Fragment caching for rendered template snippets.
+
+Templates wrap expensive markup in ``{% call cache_fragment(*key) %}``; the key
+must include everything the snippet depends on (typically an id plus the row's
+``version``), so stale entries are never read and simply age out of the LRU.
+"""
+
+from flask import current_app
+from markupsafe import Markup
+
+
+def cache_fragment(*key, caller):
+    """Return cached markup for ``key``, rendering the call block on a miss."""
+    cache = current_app.extensions['fragment_cache']
+    html = cache.get(key)
+    if html is None:
+        html = str(caller())
+        cache.set(key, html)
+    return Markup(html)
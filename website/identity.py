@@ -0,0 +1,80 @@
+"""Per-process cache of authenticated users for the Flask-Login user loader.
+
+Cached entries are detached snapshots of a user's columns. Each request gets
+its own session-bound copy via ``Session.merge(load=False)``, which never
+emits SQL, so resolving ``current_user`` costs no database round trip while
+the entry is fresh. Entries are dropped after any committed change to the
+user row and on logout.
+"""
+
+from __future__ import annotations
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from . import db
+from .cache import TTLCache
+from .models import User
+
+
+class UserIdentityCache:
+    """Bounded LRU of user snapshots with a TTL and hit/miss counters."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize, ttl)
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
+
+    def load(self, user_id) -> User | None:
+        try:
+            key = int(user_id)
+        except (TypeError, ValueError):
+            return None
+        snapshot = self._cache.get(key)
+        if snapshot is not None:
+            return db.session.merge(snapshot, load=False)
+        user = db.session.get(User, key)
+        if user is not None:
+            self._cache.set(key, _snapshot(user))
+        return user
+
+    def invalidate(self, user_id) -> None:
+        self._cache.invalidate(int(user_id))
+
+
+def _snapshot(user: User) -> User:
+    """Copy the user's column values into a detached instance safe to share."""
+    copy = User(**{attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs})
+    make_transient_to_detached(copy)
+    return copy
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changed_users(session, flush_context) -> None:
+    changed = session.info.setdefault('changed_user_ids', set())
+    for instance in list(session.dirty) + list(session.deleted):
+        if isinstance(instance, User) and instance.id is not None:
+            changed.add(instance.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_changed_users(session) -> None:
+    changed = session.info.pop('changed_user_ids', None)
+    if not changed or not has_app_context():
+        return
+    user_cache = current_app.extensions.get('user_cache')
+    if user_cache is not None:
+        for user_id in changed:
+            user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changed_users(session) -> None:
+    session.info.pop('changed_user_ids', None)
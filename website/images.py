@@ -0,0 +1,333 @@
+"""Resized WebP/JPEG derivatives of event artwork and a ``srcset`` helper.
+
+Each local image referenced by ``Event.image_url`` is resized to the widths in
+``IMAGE_DERIVATIVE_WIDTHS`` (per variant: ``thumb``, ``card``, ``hero``) and
+saved as WebP and JPEG under ``IMAGE_DERIVATIVE_DIR`` (default:
+``<instance>/derived-images``, outside the package) with the source's content
+hash in the file name, so derivatives can be cached forever and a changed
+source gets new URLs. ``manifest.json`` in the same directory maps each source
+to its files, which are served under ``IMAGE_DERIVATIVE_URL``.
+
+Derivatives are built in bulk with ``flask build-images``; saving an event
+queues its image on a background thread, so the request never waits for the
+resize. Templates call ``responsive_image(event.image_url,
+'card', alt=...)``, which emits a ``<picture>`` with WebP and JPEG ``srcset``s
+when the manifest knows the image and a plain ``<img>`` otherwise (remote URLs,
+images not yet processed, or Pillow not installed).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from flask import Flask, abort, current_app, send_from_directory, url_for
+from markupsafe import Markup, escape
+from werkzeug.security import safe_join
+
+try:
+    from PIL import Image, ImageOps
+except ModuleNotFoundError:  # Pillow is optional; templates fall back to the originals
+    Image = ImageOps = None
+
+DEFAULT_IMAGE = 'img/hero1.jpg'
+DEFAULT_WIDTHS = {
+    'thumb': (160, 320),
+    'card': (400, 800),
+    'hero': (960, 1600),
+}
+DEFAULT_SIZES = {
+    'thumb': '160px',
+    'card': '(min-width: 992px) 33vw, (min-width: 768px) 50vw, 100vw',
+    'hero': '100vw',
+}
+FORMATS = {'webp': 'image/webp', 'jpeg': 'image/jpeg'}
+_EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+_SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.gif')
+MANIFEST_NAME = 'manifest.json'
+
+
+def static_image_path(image_url: str | None) -> str | None:
+    """Path of ``image_url`` inside the static folder, or None for remote images."""
+    if not image_url:
+        return DEFAULT_IMAGE
+    if image_url.startswith(('http://', 'https://', '//')):
+        return None
+    path = image_url.lstrip('/')
+    if path.startswith('static/'):
+        path = path[len('static/'):]
+    return path
+
+
+def image_src(image_url: str | None) -> str:
+    """URL of the original image, resolving static paths."""
+    path = static_image_path(image_url)
+    return image_url if path is None else url_for('static', filename=path)
+
+
+class ImageManifest:
+    """``manifest.json`` contents, re-read when another process rewrites the file."""
+
+    _RECHECK_SECONDS = 1.0
+
+    def __init__(self, path: str, on_change=None):
+        self.path = path
+        self.on_change = on_change
+        self._entries: dict = {}
+        self._mtime: float | None = None
+        self._checked_at = float('-inf')
+        self._lock = threading.Lock()
+
+    def _reload(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < self._RECHECK_SECONDS:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            self._entries, self._mtime = {}, None
+            return
+        if mtime != self._mtime:
+            with open(self.path, encoding='utf-8') as handle:
+                self._entries = json.load(handle)
+            self._mtime = mtime
+            if self.on_change is not None:
+                self.on_change()
+
+    def get(self, source: str) -> dict | None:
+        with self._lock:
+            self._reload()
+            return self._entries.get(source)
+
+    def entries(self) -> dict:
+        with self._lock:
+            self._checked_at = float('-inf')
+            self._reload()
+            return dict(self._entries)
+
+    def update(self, source: str, entry: dict) -> None:
+        """Record ``entry`` for ``source``, merging with what other processes wrote."""
+        with self._lock:
+            self._checked_at = float('-inf')
+            self._reload()
+            entries = dict(self._entries)
+            entries[source] = entry
+            _write_atomic(self.path, json.dumps(entries, indent=2, sort_keys=True).encode('utf-8'))
+            self._entries, self._mtime = entries, os.stat(self.path).st_mtime
+        if self.on_change is not None:
+            self.on_change()
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as handle:
+        handle.write(data)
+    os.replace(temporary, path)
+
+
+def _all_widths(widths: dict) -> list[int]:
+    return sorted({width for variant in widths.values() for width in variant})
+
+
+def _encode(image, fmt: str, quality: int) -> bytes:
+    buffer = io.BytesIO()
+    if fmt == 'jpeg':
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        image.save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+    else:
+        image.save(buffer, 'WEBP', quality=quality)
+    return buffer.getvalue()
+
+
+def build_derivatives(source: str, *, force: bool = False) -> dict | None:
+    """Create the derivatives of the static image ``source`` and record them.
+
+    Returns the manifest entry, or None when the file is missing or not an
+    image. Unchanged sources are skipped unless ``force`` is set.
+    """
+    if Image is None:
+        return None
+    app = current_app._get_current_object()
+    manifest: ImageManifest = app.extensions['image_manifest']
+    source_path = safe_join(app.static_folder, source)
+    if source_path is None or not source.lower().endswith(_SOURCE_EXTENSIONS) or not os.path.isfile(source_path):
+        return None
+    with open(source_path, 'rb') as handle:
+        data = handle.read()
+    quality = app.config['IMAGE_DERIVATIVE_QUALITY']
+    widths = _all_widths(app.config['IMAGE_DERIVATIVE_WIDTHS'])
+    digest = hashlib.sha256(data + f'|q{quality}|{widths}'.encode()).hexdigest()[:12]
+    existing = manifest.get(source)
+    if existing is not None and existing['hash'] == digest and not force:
+        return existing
+
+    with Image.open(io.BytesIO(data)) as opened:
+        image = ImageOps.exif_transpose(opened)
+        image.load()
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+    original_width, original_height = image.size
+
+    directory = app.config['IMAGE_DERIVATIVE_DIR']
+    os.makedirs(directory, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(source))[0]
+    files = {fmt: {} for fmt in FORMATS}
+    # Never upscale: widths beyond the original collapse onto the original width.
+    for width in sorted({min(width, original_width) for width in widths}):
+        height = max(1, round(original_height * width / original_width))
+        resized = image if width == original_width else image.resize((width, height), Image.LANCZOS)
+        for fmt in FORMATS:
+            name = f'{stem}-{digest}-{width}w.{_EXTENSIONS[fmt]}'
+            target = os.path.join(directory, name)
+            if not os.path.exists(target):
+                _write_atomic(target, _encode(resized, fmt, quality))
+            files[fmt][str(width)] = name
+
+    entry = {
+        'hash': digest,
+        'width': original_width,
+        'height': original_height,
+        'bytes': len(data),
+        'files': files,
+    }
+    manifest.update(source, entry)
+    return entry
+
+
+class DerivativeBuilder:
+    """Builds derivatives one at a time on a background thread."""
+
+    def __init__(self, app: Flask):
+        self.app = app
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='image-derivatives')
+
+    def submit(self, source: str) -> Future:
+        return self._executor.submit(self._build, source)
+
+    def _build(self, source: str) -> dict | None:
+        with self.app.app_context():
+            try:
+                return build_derivatives(source)
+            except Exception:
+                self.app.logger.exception('Could not build image derivatives for %s', source)
+                return None
+
+
+def queue_derivatives(image_url: str | None) -> Future | None:
+    """Schedule derivatives for an event's image after it is saved; never blocks."""
+    if Image is None or not current_app.config['IMAGE_DERIVATIVES_ENABLED']:
+        return None
+    source = static_image_path(image_url)
+    if source is None:
+        return None
+    return current_app.extensions['image_builder'].submit(source)
+
+
+def stale_derivatives() -> list[str]:
+    """Files in the derivative directory that the manifest no longer references."""
+    app = current_app._get_current_object()
+    directory = app.config['IMAGE_DERIVATIVE_DIR']
+    referenced = {
+        os.path.basename(name)
+        for entry in app.extensions['image_manifest'].entries().values()
+        for names in entry['files'].values()
+        for name in names.values()
+    }
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name != MANIFEST_NAME and name not in referenced
+    )
+
+
+def _srcset(names: dict) -> tuple[str, list[int]]:
+    widths = sorted(int(width) for width in names)
+    return ', '.join(f"{url_for('derived_image', filename=names[str(width)])} {width}w" for width in widths), widths
+
+
+def _attributes(attrs: dict) -> str:
+    rendered = []
+    for name, value in attrs.items():
+        if value is None or value is False:
+            continue
+        name = name.rstrip('_').replace('_', '-')
+        rendered.append(f' {name}' if value is True else f' {name}="{escape(value)}"')
+    return ''.join(rendered)
+
+
+def responsive_image(image_url: str | None, variant: str = 'card', alt: str = '', sizes: str | None = None,
+                     **attrs) -> Markup:
+    """Render an ``<img>`` (inside a ``<picture>`` when derivatives exist) for an event image.
+
+    Extra keyword arguments become attributes of the ``<img>``; a trailing
+    underscore is stripped so ``class_`` can be passed from templates.
+    """
+    app = current_app._get_current_object()
+    source = static_image_path(image_url)
+    entry = None
+    if source is not None and app.config['IMAGE_DERIVATIVES_ENABLED']:
+        entry = app.extensions['image_manifest'].get(source)
+    sources = {}
+    if entry is not None:
+        wanted = {min(width, entry['width']) for width in app.config['IMAGE_DERIVATIVE_WIDTHS'].get(variant, ())}
+        for fmt, names in entry['files'].items():
+            sources[fmt] = _srcset({str(width): names[str(width)] for width in wanted if str(width) in names})
+    # Widths reconfigured since the last build match no derivative; use the original.
+    if not sources.get('jpeg', ('', []))[1]:
+        return Markup(f'<img src="{escape(image_src(image_url))}"{_attributes({"alt": alt, **attrs})}>')
+
+    sizes = sizes or app.config['IMAGE_DERIVATIVE_SIZES'][variant]
+    jpeg_srcset, jpeg_widths = sources['jpeg']
+    largest = jpeg_widths[-1]
+    img_attrs = {
+        'src': url_for('derived_image', filename=entry['files']['jpeg'][str(largest)]),
+        'srcset': jpeg_srcset,
+        'sizes': sizes,
+        'width': largest,
+        'height': max(1, round(entry['height'] * largest / entry['width'])),
+        'alt': alt,
+        **attrs,
+    }
+    webp_srcset = sources.get('webp', ('', []))[0]
+    webp_source = (
+        f'<source type="{FORMATS["webp"]}" srcset="{escape(webp_srcset)}" sizes="{escape(sizes)}">'
+        if webp_srcset else ''
+    )
+    return Markup(f'<picture>{webp_source}<img{_attributes(img_attrs)}></picture>')
+
+
+def serve_derivative(filename: str):
+    """Serve a derivative; names carry the source hash, so they are cached for good."""
+    app = current_app._get_current_object()
+    if filename == MANIFEST_NAME:
+        abort(404)
+    response = send_from_directory(app.config['IMAGE_DERIVATIVE_DIR'], filename)
+    response.cache_control.public = True
+    response.cache_control.max_age = app.config['ASSET_MAX_AGE']
+    response.cache_control.immutable = True
+    response.cache_control.no_cache = None
+    return response
+
+
+def init_app(app: Flask) -> None:
+    """Load the derivative manifest, serve its files and expose the template helpers."""
+    if not app.config['IMAGE_DERIVATIVE_DIR']:
+        app.config['IMAGE_DERIVATIVE_DIR'] = os.path.join(app.instance_path, 'derived-images')
+    manifest_path = os.path.join(app.config['IMAGE_DERIVATIVE_DIR'], MANIFEST_NAME)
+    # Cached event cards embed image markup, so they are dropped when derivatives change.
+    app.extensions['image_manifest'] = ImageManifest(manifest_path, on_change=app.extensions['fragment_cache'].clear)
+    app.extensions['image_builder'] = DerivativeBuilder(app)
+    app.add_url_rule(
+        f"{app.config['IMAGE_DERIVATIVE_URL'].rstrip('/')}/<path:filename>", 'derived_image', serve_derivative
+    )
+    app.jinja_env.globals['responsive_image'] = responsive_image
+    app.jinja_env.globals['image_src'] = image_src
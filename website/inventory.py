@@ -0,0 +1,240 @@
+"""In-memory ticket availability with short-lived seat holds.
+
+When a signed-in user opens an event's booking form, the allocator places a
+hold on ``INVENTORY_HOLD_QUANTITY`` seat(s) and embeds its token in the form.
+On submit the hold is claimed (and topped up to the requested quantity) before
+any write transaction starts. Requests that cannot be satisfied are answered
+from memory instead of losing a race for SQLite's write lock. Holds expire
+after ``INVENTORY_HOLD_SECONDS``; a background sweeper returns their seats.
+
+The database stays authoritative. Availability is seeded from the event's sold
+counters, refreshed every ``INVENTORY_REFRESH_SECONDS`` so other worker
+processes' sales are picked up, and every claim still goes through the
+conditional UPDATE in :mod:`website.booking`.
+"""
+
+from __future__ import annotations
+
+import heapq
+import secrets
+import threading
+import time
+from dataclasses import dataclass
+
+from flask import Flask
+
+from . import db
+from .models import Event
+
+# A rejected claim re-reads availability from the database at most this often.
+_RESEED_AFTER_REJECT = 1.0
+
+
+@dataclass
+class Hold:
+    """Seats set aside in memory for one user until ``expires_at``."""
+
+    token: str
+    event_id: int
+    user_id: int
+    ticket_type: str
+    quantity: int
+    expires_at: float
+    claimed_at: float = 0.0
+
+
+@dataclass
+class _Availability:
+    remaining: dict[str, int]
+    held: dict[str, int]
+    seeded_at: float
+
+    def free(self, ticket_type: str) -> int:
+        return self.remaining.get(ticket_type, 0) - self.held.get(ticket_type, 0)
+
+
+class InventoryAllocator:
+    """Per-process seat counts and holds, guarded by a single lock."""
+
+    def __init__(self, hold_seconds: float, refresh_seconds: float, sweep_interval: float):
+        self.hold_seconds = hold_seconds
+        self.refresh_seconds = refresh_seconds
+        self.sweep_interval = sweep_interval
+        self._events: dict[int, _Availability] = {}
+        self._holds: dict[str, Hold] = {}
+        # Live holds by (event_id, user_id), and (expires_at, token) in expiry
+        # order; renewed or removed holds leave stale heap entries that are
+        # skipped when popped.
+        self._by_user: dict[tuple[int, int], str] = {}
+        self._expiry: list[tuple[float, str]] = []
+        self._lock = threading.RLock()
+        self._sweeper: threading.Thread | None = None
+
+    # -- availability -------------------------------------------------------
+
+    def _load(self, event_id: int) -> dict[str, int] | None:
+        # The request has usually loaded this event already; overwrite that copy
+        # so the counters are read from the database, not the identity map.
+        event = db.session.get(Event, event_id, populate_existing=True)
+        if event is None:
+            return None
+        if event.is_expired or (event.status or '').strip().lower() in {'cancelled', 'sold out'}:
+            return {'general': 0, 'vip': 0}
+        return {'general': event.general_remaining_tickets, 'vip': event.vip_remaining_tickets}
+
+    def _refresh(self, event_id: int, max_age: float) -> None:
+        """Re-seed the event from the database if its entry is older than ``max_age``.
+
+        The query runs without the lock, so a slow read only delays this request;
+        the result is installed unless another request refreshed the entry since.
+        """
+        with self._lock:
+            entry = self._events.get(event_id)
+            if entry is not None and time.monotonic() - entry.seeded_at < max_age:
+                return
+        started = time.monotonic()
+        remaining = self._load(event_id)
+        with self._lock:
+            entry = self._events.get(event_id)
+            if entry is not None and entry.seeded_at >= started:
+                return
+            if remaining is None:
+                self._events.pop(event_id, None)
+                return
+            held = entry.held if entry is not None else {}
+            self._events[event_id] = _Availability(remaining, held, started)
+
+    def invalidate(self, event_id: int) -> None:
+        """Re-read the event's availability on next use (after edits or failed claims)."""
+        with self._lock:
+            entry = self._events.get(event_id)
+            if entry is not None:
+                entry.seeded_at = float('-inf')
+
+    # -- holds ----------------------------------------------------------------
+
+    def _add(self, hold: Hold) -> None:
+        self._holds[hold.token] = hold
+        self._by_user[hold.event_id, hold.user_id] = hold.token
+        heapq.heappush(self._expiry, (hold.expires_at, hold.token))
+
+    def _remove(self, hold: Hold) -> None:
+        self._holds.pop(hold.token, None)
+        if self._by_user.get((hold.event_id, hold.user_id)) == hold.token:
+            del self._by_user[hold.event_id, hold.user_id]
+
+    def _expire(self, now: float) -> None:
+        """Release holds that expired by ``now``; only expired heap entries are visited."""
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, token = heapq.heappop(self._expiry)
+            hold = self._holds.get(token)
+            if hold is not None and hold.expires_at == expires_at:
+                self._remove(hold)
+                self._drop(hold)
+
+    def _drop(self, hold: Hold) -> None:
+        entry = self._events.get(hold.event_id)
+        if entry is not None:
+            entry.held[hold.ticket_type] = max(entry.held.get(hold.ticket_type, 0) - hold.quantity, 0)
+
+    def _keep(self, hold: Hold) -> None:
+        entry = self._events.get(hold.event_id)
+        if entry is not None:
+            entry.held[hold.ticket_type] = entry.held.get(hold.ticket_type, 0) + hold.quantity
+
+    def hold(self, event_id: int, user_id: int, ticket_type: str, quantity: int) -> Hold | None:
+        """Place (or renew) the user's hold for this event; None if no seats are free."""
+        self._refresh(event_id, self.refresh_seconds)
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            existing = self._holds.get(self._by_user.get((event_id, user_id), ''))
+            if existing is not None:
+                existing.expires_at = now + self.hold_seconds
+                heapq.heappush(self._expiry, (existing.expires_at, existing.token))
+                return existing
+            entry = self._events.get(event_id)
+            if entry is None or entry.free(ticket_type) < quantity:
+                return None
+            hold = Hold(secrets.token_urlsafe(16), event_id, user_id, ticket_type, quantity, now + self.hold_seconds)
+            self._keep(hold)
+            self._add(hold)
+        self._ensure_sweeper()
+        return hold
+
+    def claim(self, token: str | None, event_id: int, user_id: int, ticket_type: str, quantity: int) -> Hold | None:
+        """Secure ``quantity`` seats for a submitted booking.
+
+        A matching hold is resized to the request; without one, seats are taken
+        from the free pool. Returns None when memory says the seats are gone. The
+        returned hold must be passed to :meth:`complete` once the database
+        reservation has finished.
+        """
+        self._refresh(event_id, self.refresh_seconds)
+        for attempt in range(2):
+            if attempt:
+                # Memory said no; check the database once more before refusing.
+                self._refresh(event_id, _RESEED_AFTER_REJECT)
+            with self._lock:
+                now = time.monotonic()
+                self._expire(now)
+                hold = self._holds.get(token) if token else None
+                if hold is not None and (hold.event_id, hold.user_id) != (event_id, user_id):
+                    hold = None  # someone else's token; leave it alone
+                if hold is not None:
+                    self._remove(hold)
+                    self._drop(hold)
+
+                entry = self._events.get(event_id)
+                if entry is not None and entry.free(ticket_type) >= quantity:
+                    claim = Hold(hold.token if hold else '', event_id, user_id, ticket_type, quantity,
+                                 float('inf'), claimed_at=now)
+                    # Claimed seats stay held until complete(), but are no longer swept.
+                    self._keep(claim)
+                    return claim
+                if hold is not None and not attempt:
+                    # Keep the user's own seats while the database is re-read.
+                    self._add(hold)
+                    self._keep(hold)
+        return None
+
+    def complete(self, claim: Hold, booked: bool) -> None:
+        """Settle a claim: booked seats leave the pool, failed ones return to it."""
+        with self._lock:
+            self._drop(claim)
+            entry = self._events.get(claim.event_id)
+            if entry is None:
+                return
+            if booked and entry.seeded_at < claim.claimed_at:
+                entry.remaining[claim.ticket_type] = entry.remaining.get(claim.ticket_type, 0) - claim.quantity
+            else:
+                # Either the database disagreed with memory, or a refresh since the
+                # claim may already include this sale; re-read rather than guess.
+                entry.seeded_at = float('-inf')
+
+    # -- sweeper --------------------------------------------------------------
+
+    def sweep(self) -> None:
+        with self._lock:
+            self._expire(time.monotonic())
+
+    def _ensure_sweeper(self) -> None:
+        with self._lock:
+            if self._sweeper is None or not self._sweeper.is_alive():
+                self._sweeper = threading.Thread(target=self._sweep_forever, name='inventory-sweeper', daemon=True)
+                self._sweeper.start()
+
+    def _sweep_forever(self) -> None:
+        while True:
+            time.sleep(self.sweep_interval)
+            self.sweep()
+
+
+def init_app(app: Flask) -> None:
+    """Create the application's allocator when seat holds are enabled."""
+    if app.config['INVENTORY_HOLDS_ENABLED']:
+        app.extensions['inventory'] = InventoryAllocator(
+            hold_seconds=app.config['INVENTORY_HOLD_SECONDS'],
+            refresh_seconds=app.config['INVENTORY_REFRESH_SECONDS'],
+            sweep_interval=app.config['INVENTORY_SWEEP_INTERVAL'],
+        )
@@ -0,0 +1,267 @@
+"""Request, SQL and booking metrics exposed in Prometheus text format.
+
+Each process keeps its own :class:`MetricsRegistry`. With ``METRICS_DIR`` set,
+workers periodically write their registry to ``metrics-<pid>.json`` in that
+directory and ``/metrics`` sums every snapshot found there, so a scrape through
+the load balancer sees totals for all workers regardless of which one answers.
+
+Snapshots are only summed while the process that wrote them is alive: a scrape
+deletes the files of exited workers, so restarts and recycled workers do not
+accumulate forever. Their totals drop out of the sum at that point, which
+Prometheus treats as an ordinary counter reset. Liveness is checked by PID,
+so the directory must only be shared by workers on the same host.
+"""
+
+from __future__ import annotations
+
+import hmac
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+from flask import Blueprint, Flask, Response, abort, current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from . import db
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_STATEMENT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+# name -> (type, help, histogram buckets)
+METRICS = {
+    'http_requests_total': ('counter', 'HTTP responses by endpoint, method and status.', None),
+    'http_request_duration_seconds': ('histogram', 'Request latency by endpoint.', _LATENCY_BUCKETS),
+    'http_request_sql_statements': ('histogram', 'SQL statements issued per request.', _STATEMENT_BUCKETS),
+    'http_request_sql_seconds_total': ('counter', 'Time spent executing SQL per endpoint.', None),
+    'booking_attempts_total': ('counter', 'Booking attempts by outcome.', None),
+}
+
+metrics_bp = Blueprint('metrics', __name__)
+
+_SNAPSHOT_NAME = re.compile(r'^metrics-(\d+)\.json$')
+
+
+class MetricsRegistry:
+    """Thread-safe counters and fixed-bucket histograms keyed by label values."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[tuple, float] = {}
+        self._histograms: dict[tuple, list] = {}
+
+    @staticmethod
+    def _key(name: str, labels: dict) -> tuple:
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        buckets = METRICS[name][2]
+        key = self._key(name, labels)
+        with self._lock:
+            entry = self._histograms.get(key)
+            if entry is None:
+                entry = self._histograms[key] = [[0] * len(buckets), 0.0, 0]
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    entry[0][index] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def snapshot(self) -> dict:
+        """JSON-serialisable copy of every series."""
+        with self._lock:
+            return {
+                'counters': [[name, dict(labels), value] for (name, labels), value in self._counters.items()],
+                'histograms': [
+                    [name, dict(labels), list(counts), total, count]
+                    for (name, labels), (counts, total, count) in self._histograms.items()
+                ],
+            }
+
+    def merge(self, snapshot: dict) -> None:
+        """Add another registry's snapshot into this one."""
+        for name, labels, value in snapshot['counters']:
+            self.inc(name, value, **labels)
+        for name, labels, counts, total, count in snapshot['histograms']:
+            key = self._key(name, labels)
+            with self._lock:
+                entry = self._histograms.setdefault(key, [[0] * len(counts), 0.0, 0])
+                entry[0] = [a + b for a, b in zip(entry[0], counts)]
+                entry[1] += total
+                entry[2] += count
+
+    def render(self) -> str:
+        """Format the registry in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        series: dict[str, list[str]] = {name: [] for name in METRICS}
+        for name, labels, value in sorted(snapshot['counters'], key=_sort_key):
+            series[name].append(f'{name}{_labels(labels)} {_number(value)}')
+        for name, labels, counts, total, count in sorted(snapshot['histograms'], key=_sort_key):
+            cumulative = 0
+            for bound, bucket_count in zip(METRICS[name][2], counts):
+                cumulative += bucket_count
+                series[name].append(f'{name}_bucket{_labels({**labels, "le": _number(bound)})} {cumulative}')
+            series[name].append(f'{name}_bucket{_labels({**labels, "le": "+Inf"})} {count}')
+            series[name].append(f'{name}_sum{_labels(labels)} {_number(total)}')
+            series[name].append(f'{name}_count{_labels(labels)} {count}')
+
+        lines = []
+        for name, (kind, help_text, _buckets) in METRICS.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            lines.extend(series[name])
+        return '\n'.join(lines) + '\n'
+
+
+def _sort_key(item) -> tuple:
+    return item[0], sorted(item[1].items())
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in sorted(labels.items())) + '}'
+
+
+def record_booking(status: str) -> None:
+    """Count a booking attempt outcome (see the constants in ``booking.py``)."""
+    registry = current_app.extensions.get('metrics')
+    if registry is not None:
+        registry.inc('booking_attempts_total', outcome=status)
+
+
+def _snapshot_path(directory: str, pid: int | None = None) -> Path:
+    return Path(directory) / f'metrics-{pid or os.getpid()}.json'
+
+
+def _write_snapshot(app: Flask) -> None:
+    path = _snapshot_path(app.config['METRICS_DIR'])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix('.tmp')
+    temporary.write_text(json.dumps(app.extensions['metrics'].snapshot()))
+    os.replace(temporary, path)
+
+
+def _process_alive(pid: int) -> bool:
+    if os.name == 'nt':
+        return True  # os.kill would terminate the process on Windows
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # alive, but owned by another user
+    return True
+
+
+def _aggregate(directory: str) -> MetricsRegistry:
+    """Merge the snapshots of the live workers sharing ``directory``, deleting the rest."""
+    combined = MetricsRegistry()
+    for path in sorted(Path(directory).glob('metrics-*.json')):
+        match = _SNAPSHOT_NAME.match(path.name)
+        if match is None:
+            continue
+        if not _process_alive(int(match.group(1))):
+            path.unlink(missing_ok=True)
+            continue
+        try:
+            combined.merge(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            continue  # a worker is mid-write or the file vanished; skip this scrape
+    return combined
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'metrics_sql_count' in g:
+        conn.info.setdefault('metrics_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('metrics_started')
+    if started and has_request_context() and 'metrics_sql_count' in g:
+        g.metrics_sql_time += time.perf_counter() - started.pop()
+        g.metrics_sql_count += 1
+
+
+def instrument_engine(engine) -> None:
+    """Attribute statements executed on ``engine`` to the current request."""
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def _scrape_allowed() -> bool:
+    """Scrapes need ``METRICS_TOKEN`` as a bearer token or an address in ``METRICS_ALLOWED_IPS``."""
+    token = current_app.config['METRICS_TOKEN']
+    if token:
+        supplied = request.headers.get('Authorization', '')
+        if hmac.compare_digest(supplied.encode(), f'Bearer {token}'.encode()):
+            return True
+    return request.remote_addr in current_app.config['METRICS_ALLOWED_IPS']
+
+
+@metrics_bp.route('/metrics')
+def metrics():
+    # Expose collected metrics for Prometheus scrapes.
+    if not _scrape_allowed():
+        abort(404)
+    directory = current_app.config['METRICS_DIR']
+    if directory:
+        _write_snapshot(current_app)
+        registry = _aggregate(directory)
+    else:
+        registry = current_app.extensions['metrics']
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+
+def init_app(app: Flask) -> None:
+    """Install the request hooks, engine listeners and ``/metrics`` endpoint."""
+    registry = app.extensions['metrics'] = MetricsRegistry()
+    flush_state = {'written_at': 0.0}
+
+    with app.app_context():
+        for engine in db.engines.values():
+            instrument_engine(engine)
+
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_started = time.perf_counter()
+        g.metrics_sql_count = 0
+        g.metrics_sql_time = 0.0
+
+    @app.after_request
+    def record_request_metrics(response):
+        if 'metrics_started' not in g:
+            return response
+        endpoint = request.endpoint or 'unmatched'
+        registry.inc('http_requests_total', endpoint=endpoint, method=request.method,
+                     status=str(response.status_code))
+        registry.observe('http_request_duration_seconds', time.perf_counter() - g.metrics_started,
+                         endpoint=endpoint)
+        registry.observe('http_request_sql_statements', g.metrics_sql_count, endpoint=endpoint)
+        registry.inc('http_request_sql_seconds_total', g.metrics_sql_time, endpoint=endpoint)
+
+        directory = app.config['METRICS_DIR']
+        now = time.monotonic()
+        if directory and now - flush_state['written_at'] >= app.config['METRICS_FLUSH_INTERVAL']:
+            flush_state['written_at'] = now
+            _write_snapshot(app)
+        return response
+
+    app.register_blueprint(metrics_bp)
@@ -0,0 +1,83 @@
+"""Minimal versioned schema migrations for the SQLite database.
+
+Each module in ``migrations/versions`` is named ``NNNN_description.py`` and
+defines ``upgrade(connection)``. Applied versions are recorded in the
+``schema_version`` table, so ``flask schema upgrade`` only runs what is new and
+can be pointed at an existing database in place.
+
+SQLite's driver runs most DDL outside an explicit transaction, so every
+migration must be idempotent (``IF NOT EXISTS``, column checks) and safe to
+re-run if it was interrupted before being recorded. That also lets databases
+created with ``db.create_all()`` be brought under version control by simply
+running ``upgrade``.
+"""
+
+from __future__ import annotations
+
+import importlib
+import pkgutil
+import re
+from datetime import datetime
+
+from sqlalchemy import text
+
+from .. import db
+from . import versions
+
+_MODULE_NAME = re.compile(r'^(\d{4})_(\w+)$')
+
+
+def available_migrations() -> list[tuple[int, str, object]]:
+    """Return ``(version, name, module)`` for every migration, in order."""
+    migrations = []
+    for info in pkgutil.iter_modules(versions.__path__):
+        match = _MODULE_NAME.match(info.name)
+        if match is None:
+            continue
+        module = importlib.import_module(f'{versions.__name__}.{info.name}')
+        migrations.append((int(match.group(1)), match.group(2), module))
+    return sorted(migrations, key=lambda migration: migration[0])
+
+
+def _ensure_version_table(connection) -> None:
+    connection.execute(text(
+        'CREATE TABLE IF NOT EXISTS schema_version ('
+        'version INTEGER PRIMARY KEY, name VARCHAR(120) NOT NULL, applied_at DATETIME NOT NULL)'
+    ))
+
+
+def applied_versions() -> set[int]:
+    """Versions already recorded in the database."""
+    with db.engine.begin() as connection:
+        _ensure_version_table(connection)
+        return set(connection.execute(text('SELECT version FROM schema_version')).scalars())
+
+
+def upgrade(target: int | None = None) -> list[tuple[int, str]]:
+    """Apply pending migrations up to ``target`` (all by default); returns those applied."""
+    done = applied_versions()
+    applied = []
+    for version, name, module in available_migrations():
+        if version in done or (target is not None and version > target):
+            continue
+        with db.engine.begin() as connection:
+            module.upgrade(connection)
+            connection.execute(
+                text('INSERT INTO schema_version (version, name, applied_at) VALUES (:version, :name, :applied_at)'),
+                {'version': version, 'name': name, 'applied_at': datetime.utcnow()},
+            )
+        applied.append((version, name))
+    return applied
+
+
+def column_names(connection, table: str) -> set[str]:
+    """Names of the columns currently defined on ``table``."""
+    return {row[1] for row in connection.exec_driver_sql(f'PRAGMA table_info("{table}")')}
+
+
+def add_column(connection, table: str, column: str, definition: str) -> bool:
+    """Add ``column`` unless it already exists; returns True when it was added."""
+    if column in column_names(connection, table):
+        return False
+    connection.exec_driver_sql(f'ALTER TABLE "{table}" ADD COLUMN {column} {definition}')
+    return True
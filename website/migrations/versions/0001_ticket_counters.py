@@ -0,0 +1,22 @@
+"""Add the denormalised per-event ticket counters and backfill them from orders."""
+
+from website.migrations import add_column
+
+
+def upgrade(connection) -> None:
+    added = add_column(connection, 'event', 'general_sold', "INTEGER DEFAULT '0' NOT NULL")
+    added = add_column(connection, 'event', 'vip_sold', "INTEGER DEFAULT '0' NOT NULL") or added
+    if added:
+        connection.exec_driver_sql(
+            """
+            UPDATE event SET
+                general_sold = COALESCE((
+                    SELECT SUM(quantity) FROM "order"
+                    WHERE "order".event_id = event.id AND "order".ticket_type = 'general'
+                ), 0),
+                vip_sold = COALESCE((
+                    SELECT SUM(quantity) FROM "order"
+                    WHERE "order".event_id = event.id AND "order".ticket_type = 'vip'
+                ), 0)
+            """
+        )
@@ -0,0 +1,12 @@
+"""Create the FTS5 event search index and its sync triggers."""
+
+from website.search import FTS_TABLE, create_search_index
+
+
+def upgrade(connection) -> None:
+    existed = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+    ).first()
+    create_search_index(connection)
+    if existed is None:
+        connection.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
@@ -0,0 +1,12 @@
+"""Track per-event versions/modification times and the catalogue state row."""
+
+from website.migrations import add_column
+
+
+def upgrade(connection) -> None:
+    add_column(connection, 'event', 'version', "INTEGER DEFAULT '1' NOT NULL")
+    add_column(connection, 'event', 'updated_at', 'DATETIME')
+    connection.exec_driver_sql(
+        'CREATE TABLE IF NOT EXISTS catalogue_state ('
+        'id INTEGER NOT NULL, version INTEGER NOT NULL, updated_at DATETIME NOT NULL, PRIMARY KEY (id))'
+    )
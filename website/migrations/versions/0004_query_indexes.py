@@ -0,0 +1,17 @@
+"""Indexes backing the listing, bookings, comments and ownership queries."""
+
+INDEXES = (
+    'CREATE INDEX IF NOT EXISTS ix_event_start_time_id ON event (start_time, id)',
+    'CREATE INDEX IF NOT EXISTS ix_event_end_time ON event (end_time)',
+    'CREATE INDEX IF NOT EXISTS ix_event_category_lower ON event (lower(category))',
+    'CREATE INDEX IF NOT EXISTS ix_event_owner_id ON event (owner_id)',
+    'CREATE INDEX IF NOT EXISTS ix_order_user_created ON "order" (user_id, created_at, id)',
+    'CREATE INDEX IF NOT EXISTS ix_order_event_id ON "order" (event_id)',
+    'CREATE INDEX IF NOT EXISTS ix_comment_event_created ON comment (event_id, created_at, id)',
+)
+
+
+def upgrade(connection) -> None:
+    for statement in INDEXES:
+        connection.exec_driver_sql(statement)
+    connection.exec_driver_sql('ANALYZE')
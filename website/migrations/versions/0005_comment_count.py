@@ -0,0 +1,11 @@
+"""Cache each event's comment count on the event row."""
+
+from website.migrations import add_column
+
+
+def upgrade(connection) -> None:
+    if add_column(connection, 'event', 'comment_count', "INTEGER DEFAULT '0' NOT NULL"):
+        connection.exec_driver_sql(
+            'UPDATE event SET comment_count = '
+            '(SELECT COUNT(*) FROM comment WHERE comment.event_id = event.id)'
+        )
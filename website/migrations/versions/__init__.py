@@ -0,0 +1 @@
+"""Schema migration scripts, applied in numeric order by ``flask schema upgrade``."""
@@ -1,6 +1,8 @@
 from datetime import datetime
 
 from flask_login import UserMixin
+from sqlalchemy import and_, case, event, func, inspect, or_
+from sqlalchemy.orm import object_session
 
 from . import db
 
@@ -25,6 +27,12 @@ class User(db.Model, UserMixin):
 
 
 class Event(db.Model):
+    __table_args__ = (
+        db.Index('ix_event_start_time_id', 'start_time', 'id'),
+        db.Index('ix_event_end_time', 'end_time'),
+        db.Index('ix_event_owner_id', 'owner_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(150), nullable=False)
     venue = db.Column(db.String(150), nullable=False)
@@ -38,6 +46,13 @@ class Event(db.Model):
     image_url = db.Column(db.String(255))
     general_capacity = db.Column(db.Integer, nullable=False, default=50)
     vip_capacity = db.Column(db.Integer, nullable=False, default=0)
+    # Denormalised ticket totals, maintained alongside every Order insert.
+    general_sold = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    vip_sold = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Bumped whenever the event or its ticket sales change; keys rendered fragments.
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    comment_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     owner_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
 
     comments = db.relationship('Comment', back_populates='event', cascade='all, delete-orphan')
@@ -66,11 +81,11 @@ class Event(db.Model):
 
     @property
     def general_tickets_sold(self) -> int:
-        return sum(order.quantity for order in self.orders if order.ticket_type == 'general')
+        return self.general_sold or 0
 
     @property
     def vip_tickets_sold(self) -> int:
-        return sum(order.quantity for order in self.orders if order.ticket_type == 'vip')
+        return self.vip_sold or 0
 
     @property
     def general_remaining_tickets(self) -> int:
@@ -89,8 +104,61 @@ class Event(db.Model):
         """Total capacity for backwards compatibility."""
         return self.general_capacity + self.vip_capacity
 
+    def touch(self) -> None:
+        """Mark the event page as changed without altering any event details."""
+        self.version = Event.version + 1
+        self.updated_at = datetime.utcnow()
+
+    @classmethod
+    def display_status_expression(cls, now: datetime):
+        """SQL counterpart of :attr:`display_status` evaluated at ``now``."""
+        status = func.trim(cls.status)
+        lowered = func.lower(status)
+        return case(
+            (lowered == 'cancelled', 'Cancelled'),
+            (
+                or_(
+                    lowered == 'sold out',
+                    and_(cls.general_sold >= cls.general_capacity, cls.vip_sold >= cls.vip_capacity),
+                ),
+                'Sold Out',
+            ),
+            (func.coalesce(cls.end_time, cls.start_time) < now, 'Inactive'),
+            (func.coalesce(status, '') == '', 'Open'),
+            else_=status,
+        )
+
+    @classmethod
+    def open_rank(cls):
+        """SQL rank that is 0 when a not-yet-ended event displays as open, else 1."""
+        status = func.lower(func.trim(cls.status))
+        has_tickets = or_(cls.general_sold < cls.general_capacity, cls.vip_sold < cls.vip_capacity)
+        return case(
+            (and_(or_(status == '', status.contains('open')), has_tickets), 0),
+            else_=1,
+        )
+
+
+# Genre filters compare case-insensitively, so index the lowered category.
+db.Index('ix_event_category_lower', func.lower(Event.category))
+
+
+@event.listens_for(Event, 'before_update')
+def _bump_event_version(mapper, connection, target: Event) -> None:
+    """Advance the version whenever an ORM flush changes event columns."""
+    session = object_session(target)
+    if session is None or not session.is_modified(target, include_collections=False):
+        return
+    if not inspect(target).attrs.version.history.has_changes():
+        target.version = Event.version + 1
+    target.updated_at = datetime.utcnow()
+
 
 class Comment(db.Model):
+    __table_args__ = (
+        db.Index('ix_comment_event_created', 'event_id', 'created_at', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     body = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -102,6 +170,11 @@ class Comment(db.Model):
 
 
 class Order(db.Model):
+    __table_args__ = (
+        db.Index('ix_order_user_created', 'user_id', 'created_at', 'id'),
+        db.Index('ix_order_event_id', 'event_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     quantity = db.Column(db.Integer, nullable=False, default=1)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -111,3 +184,23 @@ class Order(db.Model):
 
     user = db.relationship('User', back_populates='orders')
     event = db.relationship('Event', back_populates='orders')
+
+
+class CatalogueState(db.Model):
+    """Single-row record of when the public event catalogue last changed."""
+
+    __tablename__ = 'catalogue_state'
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    @classmethod
+    def bump(cls) -> None:
+        """Advance the catalogue version within the caller's transaction."""
+        now = datetime.utcnow()
+        result = db.session.execute(
+            db.update(cls).where(cls.id == 1).values(version=cls.version + 1, updated_at=now)
+        )
+        if result.rowcount == 0:
+            db.session.add(cls(id=1, version=1, updated_at=now))
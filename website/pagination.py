@@ -0,0 +1,231 @@
+"""Keyset (cursor) pagination for listing queries.
+
+Pages are addressed by the ordering key of the row at their edge rather than an
+OFFSET, so fetching page 500 costs the same indexed range scan as page 1.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from sqlalchemy import Integer, literal, tuple_, union_all
+from sqlalchemy.orm import aliased
+
+from . import db
+
+
+@dataclass
+class Page:
+    """One page of results plus the cursors for its neighbours.
+
+    ``head`` holds the first rows of the whole listing when they were requested,
+    whichever page this is.
+    """
+
+    items: list
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+    head: list = field(default_factory=list)
+
+
+def encode_cursor(values) -> str:
+    """Serialise ordering key values into an opaque, URL-safe cursor."""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+_INVALID = object()
+
+
+def _cursor_value(key, value):
+    """Convert one decoded cursor value to ``key``'s Python type, or return ``_INVALID``."""
+    if value is None:
+        return None if getattr(key, 'nullable', False) else _INVALID
+    expected = key.type.python_type
+    if expected is datetime:
+        return datetime.fromisoformat(value) if isinstance(value, str) else _INVALID
+    if expected is int:
+        return value if isinstance(value, int) and not isinstance(value, bool) else _INVALID
+    return value if isinstance(value, expected) else _INVALID
+
+
+def decode_cursor(cursor: str | None, keys) -> tuple | None:
+    """Parse a cursor produced by :func:`encode_cursor`; returns None if it is malformed.
+
+    Every value must match the Python type of its ordering key, so an edited
+    cursor can never bind an unexpected value into the query.
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != len(keys):
+            return None
+        values = tuple(_cursor_value(key, value) for key, value in zip(keys, payload))
+    except (binascii.Error, ValueError, TypeError, NotImplementedError):
+        return None
+    if any(value is _INVALID for value in values):
+        return None
+    return values
+
+
+def _bounded(statement, keys, cursor, *, reverse: bool, limit: int):
+    """``statement`` narrowed to rows strictly beyond ``cursor``, in key order and limited."""
+    if cursor is not None:
+        boundary = tuple_(*[literal(value, key.type) for key, value in zip(keys, cursor)])
+        if reverse:
+            statement = statement.where(tuple_(*keys) < boundary)
+        else:
+            statement = statement.where(tuple_(*keys) > boundary)
+    return (
+        statement
+        .order_by(None)
+        .order_by(*[key.desc() if reverse else key.asc() for key in keys])
+        .limit(limit)
+    )
+
+
+def _fetch(statement, keys, cursor, *, reverse: bool, limit: int) -> list:
+    """Rows of ``statement`` strictly beyond ``cursor`` in key order, with the keys appended."""
+    statement = _bounded(statement, keys, cursor, reverse=reverse, limit=limit).add_columns(*keys)
+    return db.session.execute(statement).all()
+
+
+def _fetch_union(statement, keys, members) -> tuple[list, list]:
+    """Run several keyset selects of a single-entity ``statement`` as one UNION ALL.
+
+    ``members`` are ``(group, where, cursor, reverse, limit, head)`` tuples; each
+    becomes an ordered, limited select on ``keys`` narrowed by ``where``. Returns
+    the page rows and the head rows as ``(entity, group, *keys)``, each in the
+    order of their members: by group, then keys, descending when ``reverse``.
+    """
+    selects = []
+    for group, where, cursor, reverse, limit, head in members:
+        member = statement if where is None else statement.where(where)
+        member = _bounded(member, keys, cursor, reverse=reverse, limit=limit).add_columns(
+            literal(head, Integer).label('_head'),
+            literal(group, Integer).label('_group'),
+            *[key.label(f'_key{index}') for index, key in enumerate(keys)],
+        )
+        selects.append(db.select(member.subquery()))
+    combined = union_all(*selects).subquery()
+    ordering = [combined.c._group, *[combined.c[f'_key{index}'] for index in range(len(keys))]]
+    entity = aliased(statement.column_descriptions[0]['entity'], combined)
+    rows = db.session.execute(
+        db.select(entity, combined.c._head, *ordering).order_by(combined.c._head, *ordering)
+    ).all()
+    page_rows, head_rows = [], []
+    for row in rows:
+        (head_rows if row[1] else page_rows).append((row[0], *row[2:]))
+    reverse = {head: reverse for _group, _where, _cursor, reverse, _limit, head in members}
+    for head, rows in enumerate((page_rows, head_rows)):
+        if reverse.get(head):
+            rows.reverse()
+    return page_rows, head_rows
+
+
+def _item(row, width: int):
+    return row[0] if len(row) == width + 1 else tuple(row[:-width])
+
+
+def paginate(statement, keys, *, per_page: int, after: str | None = None,
+             before: str | None = None, descending: bool = False, head: int = 0) -> Page:
+    """Run ``statement`` for one page ordered by ``keys``.
+
+    ``keys`` must form a unique ordering (end with a primary key). ``after``
+    fetches the page following a cursor and ``before`` the page preceding it;
+    the ordering columns are selected alongside the entity so cursors can be
+    built without touching loaded attributes. ``head`` rows from the start of
+    the listing are fetched in the same statement (``statement`` must then
+    select a single entity).
+    """
+    backwards = before is not None and after is None
+    cursor = decode_cursor(before if backwards else after, keys)
+    if cursor is None:
+        backwards = False
+
+    reverse = descending != backwards
+    head_rows = []
+    if head and cursor is not None:
+        rows, head_rows = _fetch_union(statement, keys, [
+            (0, None, cursor, reverse, per_page + 1, 0),
+            (0, None, None, descending, head, 1),
+        ])
+        rows = [(row[0], *row[2:]) for row in rows]
+    else:
+        rows = _fetch(statement, keys, cursor, reverse=reverse, limit=per_page + 1)
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backwards:
+        rows.reverse()
+
+    width = len(keys)
+    page = Page([_item(row, width) for row in rows])
+    page.head = [row[0] for row in head_rows] if cursor is not None else page.items[:head]
+    if rows:
+        first_key, last_key = tuple(rows[0][-width:]), tuple(rows[-1][-width:])
+        if backwards:
+            page.prev_cursor = encode_cursor(first_key) if has_more else None
+            page.next_cursor = encode_cursor(last_key)
+        else:
+            page.next_cursor = encode_cursor(last_key) if has_more else None
+            page.prev_cursor = encode_cursor(first_key) if cursor is not None else None
+    return page
+
+
+# Validates the group number at the front of grouped cursors.
+_GROUP_KEY = literal(0, Integer)
+
+
+def paginate_groups(statement, groups, keys, *, per_page: int, after: str | None = None,
+                    before: str | None = None, head: int = 0) -> Page:
+    """Paginate ``statement`` ordered by group, then ascending ``keys``.
+
+    ``statement`` must select a single entity. ``groups`` are WHERE clauses that
+    partition the rows; all rows of the first group come before those of the
+    second, and so on. Each group is its own ordered, limited keyset select on
+    ``keys`` (so an index on ``keys`` serves the ordering where a computed "group
+    rank" sort key could not be indexed) and the selects, along with those for
+    ``head``, are combined with UNION ALL, so a page is always one statement.
+    Cursors carry the group number followed by the key values.
+    """
+    cursor_keys = (_GROUP_KEY, *keys)
+    backwards = before is not None and after is None
+    cursor = decode_cursor(before if backwards else after, cursor_keys)
+    if cursor is not None and not 0 <= cursor[0] < len(groups):
+        cursor = None
+    if cursor is None:
+        backwards = False
+
+    start = cursor[0] if cursor is not None else 0
+    order = range(start, -1, -1) if backwards else range(start, len(groups))
+    members = [
+        (group, groups[group], cursor[1:] if cursor is not None and group == start else None,
+         backwards, per_page + 1, 0)
+        for group in order
+    ]
+    if head and cursor is not None:
+        members += [(group, groups[group], None, False, head, 1) for group in range(len(groups))]
+    rows, head_rows = _fetch_union(statement, keys, members)
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backwards:
+        rows.reverse()
+
+    page = Page([row[0] for row in rows])
+    page.head = [row[0] for row in head_rows[:head]] if cursor is not None else page.items[:head]
+    if rows:
+        first_key, last_key = tuple(rows[0][1:]), tuple(rows[-1][1:])
+        if backwards:
+            page.prev_cursor = encode_cursor(first_key) if has_more else None
+            page.next_cursor = encode_cursor(last_key)
+        else:
+            page.next_cursor = encode_cursor(last_key) if has_more else None
+            page.prev_cursor = encode_cursor(first_key) if cursor is not None else None
+    return page
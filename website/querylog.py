@@ -0,0 +1,170 @@
+"""Per-request SQL logging that flags N+1 patterns and enforces query budgets.
+
+Enabled with ``QUERY_DEBUG`` (development and tests only: it walks the stack for
+every statement). Statements are fingerprinted by shape, so the same SELECT
+issued for different ids counts as a repeat; a shape seen
+``QUERY_REPEAT_THRESHOLD`` times in one request is reported as a likely N+1 with
+the view or template line that issued it. ``QUERY_BUDGETS`` maps endpoints to
+their maximum statement count. Problems are logged, or raised when
+``QUERY_DEBUG_RAISE`` (default: ``TESTING``) is set.
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from flask import Flask, current_app, g, has_app_context, has_request_context, request
+from sqlalchemy import event
+
+from . import db
+
+_PACKAGE_DIR = str(Path(__file__).resolve().parent)
+_THIS_FILE = str(Path(__file__).resolve())
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LISTS = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """More statements were issued than the budget allows."""
+
+
+class NPlusOneDetected(AssertionError):
+    """The same statement shape was issued repeatedly within one request."""
+
+
+@dataclass
+class QueryLog:
+    """Statements recorded for one request or ``assert_max_queries`` block."""
+
+    statements: list = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.statements)
+
+    def repeats(self, threshold: int) -> list[tuple[str, int, list[str]]]:
+        """Fingerprints issued at least ``threshold`` times, with their origins."""
+        counts = Counter(fingerprint for fingerprint, _origin in self.statements)
+        report = []
+        for fingerprint, count in counts.most_common():
+            if count < threshold:
+                break
+            origins = sorted({origin for shape, origin in self.statements if shape == fingerprint})
+            report.append((fingerprint, count, origins))
+        return report
+
+    def describe(self) -> str:
+        return '\n'.join(f'  {fingerprint}  [{origin}]' for fingerprint, origin in self.statements)
+
+
+def fingerprint(statement: str) -> str:
+    """Normalise SQL so statements differing only in literal values compare equal."""
+    statement = _LITERALS.sub('?', statement)
+    statement = _PLACEHOLDER_LISTS.sub('(?)', statement)
+    return _WHITESPACE.sub(' ', statement).strip()
+
+
+def statement_origin() -> str:
+    """Innermost template or application line responsible for the current query."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        template = frame.f_globals.get('__jinja_template__')
+        if template is not None:
+            name = template.name or '<template>'
+            return f'{name}:{template.get_corresponding_lineno(frame.f_lineno)}'
+        filename = frame.f_code.co_filename
+        if filename.startswith(_PACKAGE_DIR) and filename != _THIS_FILE:
+            return f'{Path(filename).name}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return 'unknown'
+
+
+def _active_logs() -> list[QueryLog]:
+    logs = list(current_app.extensions.get('query_logs', ()))
+    if has_request_context() and 'query_log' in g:
+        logs.append(g.query_log)
+    return logs
+
+
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    if not has_app_context():
+        return
+    logs = _active_logs()
+    if logs:
+        entry = (fingerprint(statement), statement_origin())
+        for log in logs:
+            log.statements.append(entry)
+
+
+def instrument_engine(engine) -> None:
+    """Record statements executed on ``engine`` into the active query logs."""
+    if not event.contains(engine, 'before_cursor_execute', _record_statement):
+        event.listen(engine, 'before_cursor_execute', _record_statement)
+
+
+@contextmanager
+def assert_max_queries(limit: int):
+    """Fail if the block issues more than ``limit`` statements.
+
+    Works inside any application context, whether or not ``QUERY_DEBUG`` is
+    enabled; yields the :class:`QueryLog` so callers can inspect what ran.
+    """
+    for engine in db.engines.values():
+        instrument_engine(engine)
+    logs = current_app.extensions.setdefault('query_logs', [])
+    log = QueryLog()
+    logs.append(log)
+    try:
+        yield log
+    finally:
+        logs.remove(log)
+    if len(log) > limit:
+        raise QueryBudgetExceeded(f'{len(log)} queries issued, budget is {limit}:\n{log.describe()}')
+
+
+def _report(app: Flask, error: AssertionError) -> None:
+    if app.config['QUERY_DEBUG_RAISE']:
+        raise error
+    app.logger.warning('%s', error)
+
+
+def init_app(app: Flask) -> None:
+    """Install the request hooks when ``QUERY_DEBUG`` is enabled."""
+    if not app.config['QUERY_DEBUG']:
+        return
+    if app.config['QUERY_DEBUG_RAISE'] is None:
+        app.config['QUERY_DEBUG_RAISE'] = app.testing
+
+    with app.app_context():
+        for engine in db.engines.values():
+            instrument_engine(engine)
+
+    @app.before_request
+    def start_query_log():
+        g.query_log = QueryLog()
+
+    @app.after_request
+    def check_query_log(response):
+        log = g.pop('query_log', None)
+        if log is None:
+            return response
+        response.headers['X-Query-Count'] = str(len(log))
+        endpoint = request.endpoint or 'unmatched'
+
+        for shape, count, origins in log.repeats(app.config['QUERY_REPEAT_THRESHOLD']):
+            _report(app, NPlusOneDetected(
+                f'{endpoint}: possible N+1, {count}x {shape}\n  issued from: {", ".join(origins)}'
+            ))
+
+        budget = app.config['QUERY_BUDGETS'].get(endpoint)
+        if budget is not None and len(log) > budget:
+            _report(app, QueryBudgetExceeded(
+                f'{endpoint}: {len(log)} queries issued, budget is {budget}:\n{log.describe()}'
+            ))
+        return response
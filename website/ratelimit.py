@@ -0,0 +1,223 @@
+"""Token-bucket rate limiting and load shedding for the expensive POST routes.
+
+Views opt in with ``@rate_limit(scope)``. Each scope in ``RATE_LIMITS`` names an
+``ip`` and/or ``user`` budget such as ``'10/minute'``: a bucket holds that many
+tokens and refills at that rate, so short bursts pass while sustained
+hammering gets ``429 Too Many Requests`` with a ``Retry-After`` header.
+
+Buckets live in process memory by default. Set ``RATE_LIMIT_STORAGE`` to a file
+path to share them between worker processes through a small SQLite database,
+kept separate from the application database so limiter writes never queue
+behind bookings.
+
+Load shedding answers ``503`` with ``Retry-After`` before any work is done, when
+the process is serving ``LOAD_SHED_MAX_CONCURRENT`` requests or, for
+``@shed_when_queue_saturated`` views, when the booking queue is at least
+``LOAD_SHED_QUEUE_SATURATION`` full.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Flask, current_app, g, request
+from flask_login import current_user
+from werkzeug.exceptions import ServiceUnavailable, TooManyRequests
+
+_PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+_RATE = re.compile(r'^\s*(\d+)\s*/\s*(second|minute|hour|day)\s*$')
+_LIMITED_METHODS = frozenset({'POST', 'PUT', 'PATCH', 'DELETE'})
+# Endpoints never counted towards the concurrency cap.
+_SHED_EXEMPT = frozenset({'static', 'metrics.metrics'})
+
+
+def parse_rate(rate: str) -> tuple[int, float]:
+    """Turn ``'10/minute'`` into (bucket capacity, tokens refilled per second)."""
+    match = _RATE.match(rate)
+    if match is None:
+        raise ValueError(f'Invalid rate limit {rate!r}; expected e.g. "10/minute".')
+    count, period = int(match.group(1)), _PERIODS[match.group(2)]
+    return count, count / period
+
+
+def _refill(tokens: float, updated: float, now: float, capacity: int, per_second: float) -> float:
+    return min(capacity, tokens + max(now - updated, 0) * per_second)
+
+
+def _outcome(tokens: float, per_second: float) -> tuple[bool, float, float]:
+    """(allowed, tokens left, seconds until the next token) for a refilled bucket."""
+    if tokens >= 1:
+        return True, tokens - 1, 0.0
+    return False, tokens, (1 - tokens) / per_second
+
+
+class MemoryBucketStore:
+    """Per-process buckets; the least recently used keys are evicted past ``maxsize``."""
+
+    def __init__(self, maxsize: int = 100_000):
+        self.maxsize = maxsize
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, capacity: int, per_second: float) -> tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            allowed, tokens, retry_after = _outcome(_refill(tokens, updated, now, capacity, per_second), per_second)
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+
+class SQLiteBucketStore:
+    """Buckets shared by every process that points at the same SQLite file."""
+
+    _PRUNE_EVERY = 1000
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._calls = 0
+        with self._connection() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS rate_bucket ('
+                'key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            # Losing a few bucket updates in a power cut is harmless.
+            connection.execute('PRAGMA synchronous=OFF')
+            self._local.connection = connection
+        return connection
+
+    def consume(self, key: str, capacity: int, per_second: float) -> tuple[bool, float]:
+        now = time.time()
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute('SELECT tokens, updated FROM rate_bucket WHERE key = ?', (key,)).fetchone()
+            tokens, updated = row if row is not None else (capacity, now)
+            allowed, tokens, retry_after = _outcome(_refill(tokens, updated, now, capacity, per_second), per_second)
+            connection.execute(
+                'INSERT INTO rate_bucket (key, tokens, updated) VALUES (?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated',
+                (key, tokens, now),
+            )
+            self._calls += 1
+            if self._calls % self._PRUNE_EVERY == 0:
+                # Buckets idle for a day are full again; forgetting them changes nothing.
+                connection.execute('DELETE FROM rate_bucket WHERE updated < ?', (now - 86400,))
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return allowed, retry_after
+
+
+def _client_ip() -> str:
+    # Behind proxies, PROXY_FIX_X_FOR makes this the client address the trusted
+    # proxies report, never a value the client chose itself.
+    return request.remote_addr or 'unknown'
+
+
+def _default_user_key() -> str | None:
+    return current_user.get_id() if current_user.is_authenticated else None
+
+
+def check_rate_limit(scope: str, user_key=_default_user_key) -> None:
+    """Spend one token from each of the scope's buckets; raise 429 if any is empty."""
+    store = current_app.extensions.get('rate_limit_store')
+    limits = current_app.config['RATE_LIMITS'].get(scope)
+    if store is None or not limits:
+        return
+    identities = {'ip': _client_ip()}
+    if 'user' in limits:
+        identities['user'] = user_key()
+    retry_after = 0.0
+    for kind, rate in limits.items():
+        identity = identities.get(kind)
+        if identity is None:
+            continue
+        capacity, per_second = parse_rate(rate)
+        allowed, wait = store.consume(f'{scope}:{kind}:{identity}', capacity, per_second)
+        if not allowed:
+            retry_after = max(retry_after, wait)
+    if retry_after:
+        raise TooManyRequests(retry_after=max(1, math.ceil(retry_after)))
+
+
+def rate_limit(scope: str, user_key=_default_user_key):
+    """Decorate a view so its mutating requests are limited by ``RATE_LIMITS[scope]``.
+
+    ``user_key`` returns the per-user identity (the signed-in user's id by
+    default; the login view uses the submitted email instead).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            if request.method in _LIMITED_METHODS:
+                check_rate_limit(scope, user_key)
+            return view(*args, **kwargs)
+        return wrapped
+    return decorator
+
+
+def shed_when_queue_saturated(view):
+    """Answer 503 instead of queueing more work behind a nearly full booking queue."""
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        booking_queue = current_app.extensions.get('booking_queue')
+        threshold = current_app.config['LOAD_SHED_QUEUE_SATURATION']
+        if (
+            request.method in _LIMITED_METHODS
+            and booking_queue is not None
+            and threshold
+            and booking_queue.saturation() >= threshold
+        ):
+            raise ServiceUnavailable(retry_after=current_app.config['LOAD_SHED_RETRY_AFTER'])
+        return view(*args, **kwargs)
+    return wrapped
+
+
+def init_app(app: Flask) -> None:
+    """Create the bucket store and install the concurrency cap."""
+    if app.config['RATE_LIMIT_ENABLED']:
+        storage = app.config['RATE_LIMIT_STORAGE']
+        app.extensions['rate_limit_store'] = SQLiteBucketStore(storage) if storage else MemoryBucketStore()
+        for limits in app.config['RATE_LIMITS'].values():
+            for rate in limits.values():
+                parse_rate(rate)  # fail at startup rather than on the first request
+
+    max_concurrent = app.config['LOAD_SHED_MAX_CONCURRENT']
+    if not max_concurrent:
+        return
+    in_flight = [0]
+    lock = threading.Lock()
+
+    @app.before_request
+    def cap_concurrency():
+        if request.endpoint in _SHED_EXEMPT:
+            return
+        with lock:
+            if in_flight[0] >= max_concurrent:
+                raise ServiceUnavailable(retry_after=app.config['LOAD_SHED_RETRY_AFTER'])
+            in_flight[0] += 1
+        g.counted_in_flight = True
+
+    @app.teardown_request
+    def release_concurrency(_error):
+        if g.pop('counted_in_flight', False):
+            with lock:
+                in_flight[0] -= 1
@@ -0,0 +1,88 @@
+"""Route read-only requests to a separate read engine.
+
+With ``READ_ROUTING_ENABLED``, GET/HEAD requests run their SELECTs on the
+``replica`` bind: ``READ_REPLICA_URI`` when set (for example a replicated copy of
+the database), otherwise a read-only (``mode=ro``) connection pool on the primary
+SQLite file. Flushes and DML always go to the primary, so a GET that does write
+still works. After a user's own successful write, their GETs stay on the primary
+for ``READ_YOUR_WRITES_SECONDS`` so a lagging replica cannot hide the change
+they just made.
+"""
+
+from __future__ import annotations
+
+import time
+
+from flask import Flask, request, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy.engine import make_url
+
+REPLICA_BIND_KEY = 'replica'
+_SAFE_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+_WRITE_MARK = '_rw_until'
+
+
+class RoutingSession(Session):
+    """Session that reads through the replica bind while ``info['read_only']`` is set."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and self.info.get('read_only')
+            and not self._flushing
+            and not getattr(clause, 'is_dml', False)
+        ):
+            replica = self._db.engines.get(REPLICA_BIND_KEY)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def replica_uri(app: Flask) -> str | None:
+    """URI of the read engine, derived from the primary for file-backed SQLite."""
+    if app.config['READ_REPLICA_URI']:
+        return app.config['READ_REPLICA_URI']
+    url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+        return None
+    if url.query.get('uri'):
+        url = url.update_query_dict({'mode': 'ro'})
+    else:
+        url = url.set(database=f'file:{url.database}', query={'mode': 'ro', 'uri': 'true'})
+    return url.render_as_string(hide_password=False)
+
+
+def configure(app: Flask) -> None:
+    """Register the replica bind; must run before ``db.init_app``."""
+    if not app.config['READ_ROUTING_ENABLED']:
+        return
+    uri = replica_uri(app)
+    if uri is None:
+        app.logger.warning('Read routing needs READ_REPLICA_URI for this database; reads stay on the primary.')
+        return
+    binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+    binds[REPLICA_BIND_KEY] = uri
+    app.config['SQLALCHEMY_BINDS'] = binds
+
+
+def init_app(app: Flask) -> None:
+    """Mark read-only requests and record each client's last write."""
+    from . import db
+
+    if REPLICA_BIND_KEY not in (app.config.get('SQLALCHEMY_BINDS') or {}):
+        return
+
+    @app.before_request
+    def route_reads():
+        if request.method not in _SAFE_METHODS:
+            return
+        if session.get(_WRITE_MARK, 0) > time.time():
+            return
+        db.session.info['read_only'] = True
+
+    @app.after_request
+    def remember_write(response):
+        window = app.config['READ_YOUR_WRITES_SECONDS']
+        if window and request.method not in _SAFE_METHODS and response.status_code < 400:
+            session[_WRITE_MARK] = time.time() + window
+        return response
@@ -0,0 +1,95 @@
+"""SQLite FTS5 full-text index over the event catalogue.
+
+``event_fts`` is an external-content FTS5 table backed by ``event``; triggers keep
+it in sync on insert, delete and updates of the searchable columns, so ticket
+counter updates never touch the index.
+"""
+
+from __future__ import annotations
+
+import re
+
+from sqlalchemy import DDL, Float, column, event as sa_event, false, func, literal_column, table
+
+from . import db
+from .models import Event
+
+FTS_TABLE = 'event_fts'
+
+# Relative bm25 weights for title, venue, category and description.
+_RANK_WEIGHTS = (10.0, 5.0, 3.0, 1.0)
+
+_SEARCH_DDL = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, venue, category, description,
+        content='event', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON event BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, venue, category, description)
+        VALUES (new.id, new.title, new.venue, new.category, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON event BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, venue, category, description)
+        VALUES ('delete', old.id, old.title, old.venue, old.category, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, venue, category, description ON event BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, venue, category, description)
+        VALUES ('delete', old.id, old.title, old.venue, old.category, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, venue, category, description)
+        VALUES (new.id, new.title, new.venue, new.category, new.description);
+    END
+    """,
+)
+
+_fts = table(FTS_TABLE, column('rowid'))
+
+for _statement in _SEARCH_DDL:
+    sa_event.listen(Event.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+
+
+def create_search_index(connection) -> None:
+    """Create the FTS table and its sync triggers if they are missing."""
+    for statement in _SEARCH_DDL:
+        connection.exec_driver_sql(statement)
+
+
+def rebuild_search_index() -> None:
+    """Create the index if needed and repopulate it from the event table."""
+    connection = db.session.connection()
+    create_search_index(connection)
+    connection.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    db.session.commit()
+
+
+def match_expression(query: str) -> str | None:
+    """Translate free text into an FTS5 query with prefix matching on every term."""
+    terms = re.findall(r'\w+', query.lower())
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_events(statement, query: str):
+    """Restrict an ``Event`` statement to matches of ``query``; returns (statement, rank).
+
+    ``rank`` is the bm25 score of each match (lower is more relevant) for the
+    caller to order and paginate by, or None when ``query`` has no terms. Every
+    match is kept.
+    """
+    expression = match_expression(query)
+    if expression is None:
+        return statement.where(false()), None
+    statement = (
+        statement
+        .join(_fts, _fts.c.rowid == Event.id)
+        .where(literal_column(FTS_TABLE).op('MATCH')(expression))
+    )
+    return statement, func.bm25(literal_column(FTS_TABLE), *_RANK_WEIGHTS, type_=Float)
@@ -1,14 +1,27 @@
+from concurrent.futures import TimeoutError as FutureTimeout
 from datetime import datetime, timedelta
 from decimal import Decimal
 
-from flask import Blueprint, abort, flash, redirect, render_template, request, url_for
+from flask import (
+    Blueprint, Response, abort, current_app, flash, redirect, render_template, request, session,
+    stream_with_context, url_for,
+)
 from flask_login import current_user, login_required
-from sqlalchemy.orm import selectinload
-from sqlalchemy import or_
+from sqlalchemy.orm import contains_eager
 
 from . import db
-from .models import Comment, Event, Order
+from .booking import BOOKED, INVALID, SOLD_OUT, BookingResult, is_closed, rejection, reserve_tickets
+from .booking_queue import QUEUE_FULL, QueueFull
+from .comments import comment_page, post_comment
+from .conditional import conditional, make_etag
+from .exports import EXPORT_FORMATS, export_attendees
 from .forms import BookingForm, CommentForm, EventForm, EVENT_CATEGORY_OPTIONS
+from .images import queue_derivatives
+from .metrics import record_booking
+from .models import CatalogueState, Event, Order
+from .pagination import Page, paginate, paginate_groups
+from .ratelimit import rate_limit, shed_when_queue_saturated
+from .search import search_events
 
 
 main_bp = Blueprint('main', __name__)
@@ -87,26 +100,33 @@ def _resolve_event_datetimes(form: EventForm):
     return start_datetime, end_datetime, True
 
 
-@main_bp.route('/')
-def index():
-    # Render the landing page with optional search and filter results.
-    search_query = request.args.get('q', '').strip()
-    genre_filter = request.args.get('genre', '').strip()
-    quick_filter = request.args.get('quick', '').strip().lower()
-    statement = db.select(Event).order_by(Event.start_time)
+_LISTING_ORDER = (Event.start_time, Event.id)
+
+# Events shown in the home page carousel.
+_FEATURED_COUNT = 2
+
+
+def _upcoming_groups():
+    """Upcoming events are listed open ones first, each group by start time."""
+    rank = Event.open_rank()
+    return (rank == 0, rank != 0)
+
+
+def _featured_events(upcoming_page: Page, past_page: Page) -> list:
+    """Pick the carousel events: the first upcoming ones, else the most recent past ones."""
+    return upcoming_page.head or past_page.head
+
+
+def _filtered_events(search_query: str, genre_filter: str, quick_filter: str, now: datetime):
+    """Build the event statement for the home page search and filter controls.
+
+    Returns (statement, rank); ``rank`` is the search relevance, None without a search.
+    """
+    statement, rank = db.select(Event), None
     if search_query:
-        pattern = f"%{search_query}%"
-        statement = statement.where(
-            or_(
-                Event.title.ilike(pattern),
-                Event.venue.ilike(pattern),
-                Event.category.ilike(pattern),
-                Event.description.ilike(pattern),
-            )
-        )
+        statement, rank = search_events(statement, search_query)
     if genre_filter:
-        statement = statement.where(Event.category.ilike(genre_filter))
-    now = datetime.utcnow()
+        statement = statement.where(db.func.lower(Event.category) == genre_filter.lower())
     if quick_filter == 'today':
         start_of_day = datetime.combine(now.date(), datetime.min.time())
         end_of_day = start_of_day + timedelta(days=1)
@@ -122,41 +142,191 @@ def index():
         )
     elif quick_filter == 'under50':
         statement = statement.where(Event.general_price <= Decimal('50'))
+    return statement, rank
+
+
+def _query_listing(search_query: str, genre_filter: str, quick_filter: str, cursors: dict, now: datetime):
+    """Run the listing queries; returns (upcoming_page, past_page, featured_events)."""
+    statement, rank = _filtered_events(search_query, genre_filter, quick_filter, now)
+    upcoming_order = past_order = _LISTING_ORDER
+    if rank is not None:
+        # Searches list the best matches first within each section (and group).
+        upcoming_order = (rank, *_LISTING_ORDER)
+        past_order = (-rank, *_LISTING_ORDER)
+    upcoming_statement = statement.where(Event.end_time >= now)
+    past_statement = statement.where(Event.end_time < now)
+    per_page = current_app.config['EVENTS_PER_PAGE']
+    upcoming_page = paginate_groups(
+        upcoming_statement,
+        _upcoming_groups(),
+        upcoming_order,
+        per_page=per_page,
+        after=cursors['after'],
+        before=cursors['before'],
+        head=_FEATURED_COUNT,
+    )
+    past_page = paginate(
+        past_statement,
+        past_order,
+        per_page=per_page,
+        after=cursors['past_after'],
+        before=cursors['past_before'],
+        descending=True,
+        head=_FEATURED_COUNT,
+    )
+    featured_events = _featured_events(upcoming_page, past_page)
+    return upcoming_page, past_page, featured_events
+
+
+def _listing_ttl(now: datetime, next_change: datetime | None) -> float:
+    """Seconds the cached listing may be served before time alone could change it."""
+    ttl = current_app.config['LISTING_CACHE_TTL']
+    if next_change is not None:
+        ttl = min(ttl, (next_change - now).total_seconds())
+    return ttl
+
+
+def _listing(search_query: str, genre_filter: str, quick_filter: str, cursors: dict,
+             now: datetime, validators: tuple, next_change: datetime | None):
+    """Return the listing pages, serving event ids from the listing cache when possible.
+
+    Only the ids and cursors are cached; the events themselves are reloaded with
+    one primary-key query so ticket counts and statuses on the cards stay live.
+    The key includes the listing validators (catalogue version and time markers),
+    so a write in any worker process moves every worker onto a fresh entry.
+    """
+    cache = current_app.extensions['listing_cache']
+    key = (
+        validators,
+        ' '.join(search_query.lower().split()),
+        genre_filter.lower(),
+        quick_filter,
+        tuple(sorted(cursors.items())),
+        current_app.config['EVENTS_PER_PAGE'],
+    )
+    snapshot = cache.get(key)
+    if snapshot is None:
+        upcoming_page, past_page, featured_events = _query_listing(
+            search_query, genre_filter, quick_filter, cursors, now
+        )
+        if cache.maxsize > 0:
+            cache.set(key, {
+                'upcoming': ([event.id for event in upcoming_page.items], upcoming_page.next_cursor, upcoming_page.prev_cursor),
+                'past': ([event.id for event in past_page.items], past_page.next_cursor, past_page.prev_cursor),
+                'featured': [event.id for event in featured_events],
+            }, ttl=_listing_ttl(now, next_change))
+        return upcoming_page, past_page, featured_events
+
+    wanted = set(snapshot['upcoming'][0]) | set(snapshot['past'][0]) | set(snapshot['featured'])
+    events_by_id = {}
+    if wanted:
+        events_by_id = {
+            event.id: event
+            for event in db.session.scalars(db.select(Event).where(Event.id.in_(wanted)))
+        }
+
+    def restore(ids):
+        return [events_by_id[event_id] for event_id in ids if event_id in events_by_id]
+
+    upcoming_ids, upcoming_next, upcoming_prev = snapshot['upcoming']
+    past_ids, past_next, past_prev = snapshot['past']
+    return (
+        Page(restore(upcoming_ids), upcoming_next, upcoming_prev),
+        Page(restore(past_ids), past_next, past_prev),
+        restore(snapshot['featured']),
+    )
+
+
+def _invalidate_inventory(event_id: int) -> None:
+    """Make the seat allocator re-read an event whose capacity or status changed."""
+    inventory = current_app.extensions.get('inventory')
+    if inventory is not None:
+        inventory.invalidate(event_id)
+
+
+def _listing_validators(quick_filter: str, now: datetime):
+    """Return (etag parts, last modified, next change) for the home page listing at ``now``.
+
+    Besides the catalogue version, the listing changes when an event starts or
+    ends, when an event enters the "This Week" window and, for "Today", at
+    midnight; the most recent of each of those instants is part of the ETag and
+    the soonest upcoming one bounds how long the listing cache may be reused.
+    Both directions are read in a single query.
+    """
+    week = timedelta(days=7)
+    (
+        version, updated_at, last_start, last_end, last_week_entry,
+        next_start, next_end, next_week_entry,
+    ) = db.session.execute(
+        db.select(
+            db.select(CatalogueState.version).where(CatalogueState.id == 1).scalar_subquery(),
+            db.select(CatalogueState.updated_at).where(CatalogueState.id == 1).scalar_subquery(),
+            db.select(db.func.max(Event.start_time)).where(Event.start_time <= now).scalar_subquery(),
+            db.select(db.func.max(Event.end_time)).where(Event.end_time < now).scalar_subquery(),
+            db.select(db.func.max(Event.start_time)).where(Event.start_time < now + week).scalar_subquery(),
+            db.select(db.func.min(Event.start_time)).where(Event.start_time > now).scalar_subquery(),
+            db.select(db.func.min(Event.end_time)).where(Event.end_time >= now).scalar_subquery(),
+            db.select(db.func.min(Event.start_time)).where(Event.start_time >= now + week).scalar_subquery(),
+        )
+    ).one()
+    changes = [updated_at, last_start, last_end]
+    upcoming = [next_start, next_end, next_week_entry - week if next_week_entry is not None else None]
+    if quick_filter == 'week' and last_week_entry is not None:
+        changes.append(last_week_entry - week)
+    if quick_filter == 'today':
+        changes.append(datetime.combine(now.date(), datetime.min.time()))
+        upcoming.append(datetime.combine(now.date() + timedelta(days=1), datetime.min.time()))
+    last_modified = max((change for change in changes if change is not None), default=None)
+    next_change = min((change for change in upcoming if change is not None), default=None)
+    parts = (version, last_start, last_end, last_week_entry, now.date())
+    return parts, last_modified, next_change
+
+
+@main_bp.route('/')
+def index():
+    # Render the landing page with optional search and filter results.
+    search_query = request.args.get('q', '').strip()
+    genre_filter = request.args.get('genre', '').strip()
+    quick_filter = request.args.get('quick', '').strip().lower()
     quick_filter_label = next(
         (label for value, label in QUICK_FILTER_OPTIONS if value == quick_filter),
         None,
     )
-    events = db.session.scalars(
-        statement
-    ).all()
-    upcoming_events = [
-        event for event in events
-        if not event.is_expired
-    ]
-    upcoming_events.sort(
-        key=lambda event: (
-            0 if 'open' in (event.display_status or '').lower() else 1,
-            event.start_time or datetime.max,
+    now = datetime.utcnow()
+    etag_parts, last_modified, next_change = _listing_validators(quick_filter, now)
+    etag = make_etag('index', *etag_parts, current_user.get_id(), request.full_path)
+
+    def render():
+        cursors = {name: request.args.get(name) for name in ('after', 'before', 'past_after', 'past_before')}
+        upcoming_page, past_page, featured_events = _listing(
+            search_query, genre_filter, quick_filter, cursors, now, etag_parts, next_change
         )
-    )
-    past_events = [
-        event for event in events
-        if event.is_expired
-    ]
-    featured_events = upcoming_events[:2] if upcoming_events else events[:2]
-    return render_template(
-        'index.html',
-        events=events,
-        upcoming_events=upcoming_events,
-        past_events=past_events,
-        featured_events=featured_events,
-        search_query=search_query,
-        genres=GENRE_OPTIONS,
-        selected_genre=genre_filter,
-        quick_filters=QUICK_FILTER_OPTIONS,
-        quick_filter=quick_filter,
-        quick_filter_label=quick_filter_label,
-    )
+        filter_args = {
+            'q': search_query or None,
+            'genre': genre_filter or None,
+            'quick': quick_filter or None,
+        }
+        return render_template(
+            'index.html',
+            upcoming_events=upcoming_page.items,
+            upcoming_page=upcoming_page,
+            past_events=past_page.items,
+            past_page=past_page,
+            filter_args=filter_args,
+            featured_events=featured_events,
+            search_query=search_query,
+            genres=GENRE_OPTIONS,
+            selected_genre=genre_filter,
+            quick_filters=QUICK_FILTER_OPTIONS,
+            quick_filter=quick_filter,
+            quick_filter_label=quick_filter_label,
+        )
+
+    # Pending flashes are rendered into this response, so it must not be
+    # answered with a 304 or carry validators for the flash-free page.
+    if session.get('_flashes'):
+        return render()
+    return conditional(etag, last_modified, render, private=current_user.is_authenticated)
 
 
 def _render_event(event: Event, booking_form: BookingForm | None = None, comment_form: CommentForm | None = None):
@@ -167,27 +337,27 @@ def _render_event(event: Event, booking_form: BookingForm | None = None, comment
         comment_form = CommentForm()
 
     general_available, vip_available = _configure_booking_form(booking_form, event)
-
-    image_url = event.image_url
-    if image_url:
-        if image_url.startswith(('http://', 'https://')):
-            resolved_image_url = image_url
-        else:
-            normalized_path = image_url.lstrip('/')
-            if normalized_path.startswith('static/'):
-                normalized_path = normalized_path[len('static/'):]
-            resolved_image_url = url_for('static', filename=normalized_path)
-    else:
-        resolved_image_url = url_for('static', filename='img/hero1.jpg')
+    inventory = current_app.extensions.get('inventory')
+    if (
+        inventory is not None
+        and current_user.is_authenticated
+        and booking_form.quantity.choices
+        and not booking_form.hold_token.data
+    ):
+        hold = inventory.hold(
+            event.id, current_user.id, booking_form.ticket_type.data, current_app.config['INVENTORY_HOLD_QUANTITY']
+        )
+        if hold is not None:
+            booking_form.hold_token.data = hold.token
 
     can_manage = current_user.is_authenticated and event.owner_id == current_user.id
 
     return render_template(
         'event.html',
         event=event,
-        event_image_url=resolved_image_url,
         booking_form=booking_form,
         comment_form=comment_form,
+        comments=comment_page(event.id, request.args.get('comments_after')),
         can_manage=can_manage,
         general_available=general_available,
         vip_available=vip_available,
@@ -200,21 +370,60 @@ def event(event_id: int):
     event = db.session.get(Event, event_id)
     if event is None:
         abort(404)
-    return _render_event(event)
+    # Signed-in pages embed per-session CSRF tokens and flashes must be shown,
+    # so only plain anonymous views are revalidated.
+    if current_user.is_authenticated or session.get('_flashes'):
+        return _render_event(event)
+    last_modified = event.updated_at
+    if event.is_expired and (last_modified is None or event.end_time > last_modified):
+        last_modified = event.end_time
+    etag = make_etag('event', event.id, event.version, event.is_expired, request.args.get('comments_after'))
+    return conditional(etag, last_modified, lambda: _render_event(event))
+
+
+@main_bp.route('/events/<int:event_id>/comments')
+def event_comments(event_id: int):
+    # Return the next page of comments as an HTML fragment for "Load more".
+    event = db.session.get(Event, event_id)
+    if event is None:
+        abort(404)
+    comments = comment_page(event.id, request.args.get('after'))
+    return render_template('partials/comments.html', event=event, comments=comments)
 
 
 @main_bp.route('/bookings')
 @login_required
 def bookings():
     # Show the authenticated user's booking history.
-    orders = db.session.scalars(
-        db.select(Order)
+    # Orders, their events and each event's display status come back in one
+    # query; the sold counters on Event make the status a plain column expression.
+    statement = (
+        db.select(Order, Event.display_status_expression(datetime.utcnow()).label('event_status'))
+        .outerjoin(Order.event)
+        .options(contains_eager(Order.event))
         .where(Order.user_id == current_user.id)
-        .options(selectinload(Order.event))
-        .order_by(Order.created_at.desc())
-    ).all()
-
-    return render_template('bookings.html', orders=orders)
+    )
+    page = paginate(
+        statement,
+        (Order.created_at, Order.id),
+        per_page=current_app.config['BOOKINGS_PER_PAGE'],
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+        descending=True,
+    )
+    pending_bookings = []
+    booking_queue = current_app.extensions.get('booking_queue')
+    if booking_queue is not None:
+        pending_bookings, resolved = booking_queue.take_pending(current_user.id)
+        for entry in resolved:
+            if entry.future.exception() is not None:
+                flash(f'Your booking for {entry.event_title} could not be completed. Please try again.', 'danger')
+                continue
+            message, category = _booking_message(entry.future.result(), entry.ticket_type, entry.event_title)
+            if category != 'success':
+                message = f'{entry.event_title}: {message}'
+            flash(message, category)
+    return render_template('bookings.html', bookings=page, pending_bookings=pending_bookings)
 
 
 @main_bp.route('/events/create', methods=['GET', 'POST'])
@@ -256,7 +465,9 @@ def create_event():
         )
 
         db.session.add(event)
+        CatalogueState.bump()
         db.session.commit()
+        queue_derivatives(event.image_url)
 
         flash('Event created successfully!', 'success')
         return redirect(url_for('main.event', event_id=event.id))
@@ -325,8 +536,11 @@ def edit_event(event_id: int):
         event.image_url = form.image_url.data
         event.general_capacity = form.general_capacity.data
         event.vip_capacity = form.vip_capacity.data
+        CatalogueState.bump()
 
         db.session.commit()
+        _invalidate_inventory(event.id)
+        queue_derivatives(event.image_url)
 
         flash('Event updated successfully!', 'success')
         return redirect(url_for('main.event', event_id=event.id))
@@ -336,6 +550,8 @@ def edit_event(event_id: int):
 
 @main_bp.route('/events/<int:event_id>/book', methods=['POST'])
 @login_required
+@shed_when_queue_saturated
+@rate_limit('booking')
 def book_event(event_id: int):
     # Process ticket purchases for a specific event.
     event = db.session.get(Event, event_id)
@@ -346,47 +562,98 @@ def book_event(event_id: int):
     _configure_booking_form(form, event)
 
     if not form.validate_on_submit():
+        # Quantity choices shrink with availability, so a sold-out selection fails validation.
+        outcome = rejection(event, form.ticket_type.data, request.form.get('quantity', 1, type=int)).status
+        record_booking(outcome if outcome == SOLD_OUT or not form.quantity.choices else INVALID)
         flash('Please select a valid ticket quantity.', 'danger')
         return redirect(url_for('main.event', event_id=event.id))
 
     ticket_type = form.ticket_type.data
     if ticket_type not in {'general', 'vip'}:
+        record_booking(INVALID)
         flash('Invalid ticket type selected.', 'danger')
         return redirect(url_for('main.event', event_id=event.id))
 
-    selected_available = (
-        event.general_remaining_tickets if ticket_type == 'general' else event.vip_remaining_tickets
-    )
+    claim = None
+    inventory = current_app.extensions.get('inventory')
+    if inventory is not None:
+        # Seats are secured in memory first, so requests that would lose the race
+        # for the last tickets never open a write transaction.
+        claim = inventory.claim(form.hold_token.data, event.id, current_user.id, ticket_type, form.quantity.data)
+        if claim is None:
+            outcome = rejection(event, ticket_type, form.quantity.data)
+            if is_closed(event):
+                record_booking(outcome.status)
+                flash(*_booking_message(outcome, ticket_type))
+                return redirect(url_for('main.event', event_id=event.id))
+            # Seats held for other users count as taken while the database still lists them.
+            record_booking(SOLD_OUT)
+            flash('Those tickets have just been taken. Please choose a different quantity or ticket type.', 'warning')
+            return redirect(url_for('main.event', event_id=event.id))
+
+    booking_queue = current_app.extensions.get('booking_queue')
+    if booking_queue is None:
+        try:
+            result = reserve_tickets(event.id, current_user.id, ticket_type, form.quantity.data)
+        except Exception:
+            if claim is not None:
+                inventory.complete(claim, booked=False)
+            raise
+        if claim is not None:
+            inventory.complete(claim, booked=result.ok)
+        record_booking(result.status)
+    else:
+        event_title = event.title
+        try:
+            pending = booking_queue.submit(event.id, current_user.id, ticket_type, form.quantity.data, event_title)
+        except QueueFull:
+            if claim is not None:
+                inventory.complete(claim, booked=False)
+            record_booking(QUEUE_FULL)
+            flash('Bookings are very busy right now. Please try again in a moment.', 'warning')
+            return redirect(url_for('main.event', event_id=event_id))
+        if claim is not None:
+            pending.future.add_done_callback(
+                lambda future: inventory.complete(claim, booked=future.exception() is None and future.result().ok)
+            )
+        # Release this request's read transaction so it cannot hold up the writer's commit.
+        db.session.close()
+        try:
+            result = pending.future.result(timeout=current_app.config['BOOKING_QUEUE_WAIT'])
+        except FutureTimeout:
+            flash(f'Your booking for {event_title} is being processed and will appear here shortly.', 'info')
+            return redirect(url_for('main.bookings'))
+        booking_queue.forget(pending)
+
+    message, category = _booking_message(result, ticket_type)
+    flash(message, category)
+    if not result.ok:
+        return redirect(url_for('main.event', event_id=event_id))
+    return redirect(url_for('main.bookings'))
 
-    if selected_available <= 0 or event.is_expired or event.status.lower() in {'cancelled', 'sold out'}:
-        flash('Bookings are unavailable for this event at this time.', 'warning')
-        return redirect(url_for('main.event', event_id=event.id))
 
-    if form.quantity.data > selected_available:
-        flash(
-            f'Only {selected_available} ticket{"s" if selected_available != 1 else ""} remain for this ticket type.',
-            'warning'
+def _booking_message(result: BookingResult, ticket_type: str, event_title: str | None = None) -> tuple[str, str]:
+    """Flash message and category describing a booking outcome."""
+    if result.status == SOLD_OUT:
+        if result.remaining <= 0:
+            return 'Sorry, this ticket type is sold out.', 'warning'
+        return (
+            f'Only {result.remaining} ticket{"s" if result.remaining != 1 else ""} remain for this ticket type.',
+            'warning',
         )
-        return redirect(url_for('main.event', event_id=event.id))
-
-    order = Order(user=current_user, event=event, quantity=form.quantity.data, ticket_type=ticket_type)
-    db.session.add(order)
-    db.session.commit()
-
-    if event.total_remaining_tickets <= 0 and event.status.lower() != 'sold out':
-        event.status = 'Sold Out'
-        db.session.commit()
-
+    if result.status != BOOKED:
+        return 'Bookings are unavailable for this event at this time.', 'warning'
     ticket_label = 'VIP' if ticket_type == 'vip' else 'General Admission'
-    flash(
-        f'{ticket_label} tickets booked successfully! Order #{order.id:05d} is now in your bookings.',
-        'success'
+    subject = f'{ticket_label} tickets for {event_title}' if event_title else f'{ticket_label} tickets'
+    return (
+        f'{subject} booked successfully! Order #{result.order_id:05d} is now in your bookings.',
+        'success',
     )
-    return redirect(url_for('main.bookings'))
 
 
 @main_bp.route('/events/<int:event_id>/comments', methods=['POST'])
 @login_required
+@rate_limit('comment')
 def add_comment(event_id: int):
     # Persist a new comment on an event from the logged-in user.
     event = db.session.get(Event, event_id)
@@ -395,9 +662,7 @@ def add_comment(event_id: int):
 
     form = CommentForm()
     if form.validate_on_submit():
-        comment = Comment(body=form.body.data, user=current_user, event=event)
-        db.session.add(comment)
-        db.session.commit()
+        post_comment(event, current_user, form.body.data)
         flash('Comment posted successfully.', 'success')
         return redirect(url_for('main.event', event_id=event.id))
 
@@ -419,7 +684,9 @@ def cancel_event(event_id: int):
         return redirect(url_for('main.event', event_id=event.id))
 
     event.status = 'Cancelled'
+    CatalogueState.bump()
     db.session.commit()
+    _invalidate_inventory(event.id)
     flash('Event cancelled successfully. Attendees can no longer book tickets.', 'info')
     return redirect(url_for('main.event', event_id=event.id))
 
@@ -438,7 +705,9 @@ def mark_event_sold_out(event_id: int):
         return redirect(url_for('main.event', event_id=event.id))
 
     event.status = 'Sold Out'
+    CatalogueState.bump()
     db.session.commit()
+    _invalidate_inventory(event.id)
     flash('Event marked as sold out.', 'success')
     return redirect(url_for('main.event', event_id=event.id))
 
@@ -460,6 +729,27 @@ def reopen_event(event_id: int):
         return redirect(url_for('main.event', event_id=event.id))
 
     event.status = 'Open'
+    CatalogueState.bump()
     db.session.commit()
+    _invalidate_inventory(event.id)
     flash('Event reopened. Attendees can book tickets again.', 'success')
     return redirect(url_for('main.event', event_id=event.id))
+
+
+@main_bp.route('/events/<int:event_id>/attendees.<export_format>')
+@login_required
+def export_event_attendees(event_id: int, export_format: str):
+    # Stream the event's attendee list to its owner as CSV or NDJSON.
+    if export_format not in EXPORT_FORMATS:
+        abort(404)
+    event = db.session.get(Event, event_id)
+    if event is None:
+        abort(404)
+    if event.owner_id != current_user.id:
+        abort(403)
+
+    chunks = export_attendees(event.id, export_format, current_app.config['EXPORT_BATCH_SIZE'])
+    response = Response(stream_with_context(chunks), mimetype=EXPORT_FORMATS[export_format])
+    response.headers['Content-Disposition'] = f'attachment; filename="event-{event.id}-attendees.{export_format}"'
+    response.cache_control.no_store = True
+    return response